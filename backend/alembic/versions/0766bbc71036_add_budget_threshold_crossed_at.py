@@ -0,0 +1,40 @@
+"""Add budget threshold_crossed_at
+
+Revision ID: 0766bbc71036
+Revises: 87b29f865af2
+Create Date: 2026-10-16 15:02:11.418377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0766bbc71036'
+down_revision: Union[str, None] = '87b29f865af2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('budgets', sa.Column('threshold_crossed_at', sa.DateTime(timezone=True), nullable=True))
+
+    # spent is maintained by transaction writes from now on; start it from history
+    op.execute("""
+        UPDATE budgets SET spent = COALESCE((
+            SELECT SUM(transactions.amount) FROM transactions
+            WHERE transactions.category_id = budgets.category_id
+              AND transactions.type = 'EXPENSE'
+              AND transactions.date BETWEEN budgets.start_date AND budgets.end_date
+        ), 0)
+    """)
+    op.execute("""
+        UPDATE budgets SET threshold_crossed_at = CURRENT_TIMESTAMP
+        WHERE amount > 0 AND spent >= amount * notification_threshold
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('budgets', 'threshold_crossed_at')
@@ -0,0 +1,39 @@
+"""Store money as integer cents
+
+Revision ID: 3b082626f8d5
+Revises: 0766bbc71036
+Create Date: 2026-10-17 00:21:48.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b082626f8d5'
+down_revision: Union[str, None] = '0766bbc71036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [
+    ('transactions', 'amount'),
+    ('accounts', 'balance'),
+    ('budgets', 'amount'),
+    ('budgets', 'spent'),
+    ('monthly_rollups', 'total'),
+]
+
+
+def upgrade() -> None:
+    # Float major units -> BIGINT minor units (app.money.Money)
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, type_=sa.BigInteger(), existing_type=sa.Float(),
+                        postgresql_using=f'round({column}::numeric * 100)::bigint')
+
+
+def downgrade() -> None:
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, type_=sa.Float(), existing_type=sa.BigInteger(),
+                        postgresql_using=f'{column} / 100.0')
@@ -0,0 +1,59 @@
+"""Add account balance snapshots
+
+Revision ID: 5c41d7e2a9b8
+Revises: 3b082626f8d5
+Create Date: 2026-10-17 09:12:37.415820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c41d7e2a9b8'
+down_revision: Union[str, None] = '3b082626f8d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('account_balance_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('closing_balance', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_account_balance_snapshots_id'), 'account_balance_snapshots', ['id'], unique=False)
+    op.create_index('ix_account_balance_snapshots_account_id_month', 'account_balance_snapshots',
+                    ['account_id', 'month'], unique=True)
+
+    # The partial-month scan reads (account_id, date) ranges; the composite
+    # index covers the old single-column one
+    op.drop_index('ix_transactions_account_id', table_name='transactions')
+    op.create_index('ix_transactions_account_id_date', 'transactions', ['account_id', 'date'],
+                    unique=False, postgresql_include=['amount', 'type'])
+
+    # Backfill: running sum of each account's monthly net flow
+    op.execute("""
+        INSERT INTO account_balance_snapshots (account_id, month, closing_balance)
+        SELECT account_id, month, SUM(net) OVER (PARTITION BY account_id ORDER BY month)
+        FROM (
+            SELECT account_id, CAST(date_trunc('month', date) AS DATE) AS month,
+                   SUM(CASE WHEN type = 'INCOME' THEN amount ELSE -amount END) AS net
+            FROM transactions
+            WHERE account_id IS NOT NULL AND date IS NOT NULL
+            GROUP BY account_id, CAST(date_trunc('month', date) AS DATE)
+        ) AS monthly
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_account_id_date', table_name='transactions')
+    op.create_index('ix_transactions_account_id', 'transactions', ['account_id'], unique=False)
+    op.drop_index('ix_account_balance_snapshots_account_id_month', table_name='account_balance_snapshots')
+    op.drop_index(op.f('ix_account_balance_snapshots_id'), table_name='account_balance_snapshots')
+    op.drop_table('account_balance_snapshots')
@@ -0,0 +1,28 @@
+"""Add transaction category date index
+
+Revision ID: 87b29f865af2
+Revises: a5917a34e95f
+Create Date: 2026-10-16 14:20:37.641092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '87b29f865af2'
+down_revision: Union[str, None] = 'a5917a34e95f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Budget spend joins budgets to transactions on category and date window
+    op.create_index('ix_transactions_category_id_date', 'transactions', ['category_id', 'date'], unique=False,
+                    postgresql_include=['amount', 'type'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_category_id_date', table_name='transactions')
@@ -0,0 +1,33 @@
+"""Add transaction description search index
+
+Revision ID: 8e2f4a61c07d
+Revises: 5c41d7e2a9b8
+Create Date: 2026-10-17 14:26:03.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f4a61c07d'
+down_revision: Union[str, None] = '5c41d7e2a9b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same expression as models.TRANSACTION_SEARCH_VECTOR; the 'simple'
+    # configuration lowercases without stemming, so merchant names and
+    # non-English descriptions match as typed
+    op.create_index(
+        'ix_transactions_description_search', 'transactions',
+        [sa.text("to_tsvector('simple'::regconfig, coalesce(description, ''))")],
+        unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_description_search', table_name='transactions')
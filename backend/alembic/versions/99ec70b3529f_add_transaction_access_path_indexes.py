@@ -0,0 +1,49 @@
+"""Add transaction access path indexes
+
+Revision ID: 99ec70b3529f
+Revises: cae7f59e7243
+Create Date: 2026-10-16 09:12:41.508310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '99ec70b3529f'
+down_revision: Union[str, None] = 'cae7f59e7243'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Transaction listing and keyset pagination: owner_id = ? ORDER BY date, id
+    op.create_index('ix_transactions_owner_id_date_id', 'transactions', ['owner_id', 'date', 'id'], unique=False)
+    # Income/expense totals and trends; covers amount and category_id on Postgres
+    op.create_index('ix_transactions_owner_id_type_date', 'transactions', ['owner_id', 'type', 'date'], unique=False,
+                    postgresql_include=['amount', 'category_id'])
+    # Budget spend and category breakdowns
+    op.create_index('ix_transactions_owner_id_category_id_date', 'transactions', ['owner_id', 'category_id', 'date'], unique=False,
+                    postgresql_include=['amount', 'type'])
+    # Dashboard sections that are not scoped to an owner
+    op.create_index('ix_transactions_type_date', 'transactions', ['type', 'date'], unique=False,
+                    postgresql_include=['amount', 'category_id'])
+    op.create_index('ix_transactions_date', 'transactions', ['date'], unique=False)
+    op.create_index('ix_transactions_account_id', 'transactions', ['account_id'], unique=False)
+    op.create_index('ix_accounts_owner_id', 'accounts', ['owner_id'], unique=False)
+    op.create_index('ix_categories_owner_id', 'categories', ['owner_id'], unique=False)
+    op.create_index('ix_budgets_owner_id_category_id', 'budgets', ['owner_id', 'category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budgets_owner_id_category_id', table_name='budgets')
+    op.drop_index('ix_categories_owner_id', table_name='categories')
+    op.drop_index('ix_accounts_owner_id', table_name='accounts')
+    op.drop_index('ix_transactions_account_id', table_name='transactions')
+    op.drop_index('ix_transactions_date', table_name='transactions')
+    op.drop_index('ix_transactions_type_date', table_name='transactions')
+    op.drop_index('ix_transactions_owner_id_category_id_date', table_name='transactions')
+    op.drop_index('ix_transactions_owner_id_type_date', table_name='transactions')
+    op.drop_index('ix_transactions_owner_id_date_id', table_name='transactions')
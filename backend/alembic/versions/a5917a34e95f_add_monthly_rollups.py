@@ -0,0 +1,52 @@
+"""Add monthly rollups
+
+Revision ID: a5917a34e95f
+Revises: 99ec70b3529f
+Create Date: 2026-10-16 11:47:05.183924
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5917a34e95f'
+down_revision: Union[str, None] = '99ec70b3529f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('monthly_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('type', postgresql.ENUM('INCOME', 'EXPENSE', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_monthly_rollups_id'), 'monthly_rollups', ['id'], unique=False)
+    op.create_index('ix_monthly_rollups_owner_id_month_type_category_id', 'monthly_rollups',
+                    ['owner_id', 'month', 'type', 'category_id'], unique=True)
+
+    # Backfill from existing transactions
+    op.execute("""
+        INSERT INTO monthly_rollups (owner_id, month, type, category_id, total, count)
+        SELECT owner_id, CAST(date_trunc('month', date) AS DATE), type, category_id, SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE owner_id IS NOT NULL AND date IS NOT NULL AND type IS NOT NULL
+        GROUP BY owner_id, CAST(date_trunc('month', date) AS DATE), type, category_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monthly_rollups_owner_id_month_type_category_id', table_name='monthly_rollups')
+    op.drop_index(op.f('ix_monthly_rollups_id'), table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
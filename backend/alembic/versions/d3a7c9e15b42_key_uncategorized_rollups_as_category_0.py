@@ -0,0 +1,45 @@
+"""Key uncategorized rollups as category 0
+
+Revision ID: d3a7c9e15b42
+Revises: 8e2f4a61c07d
+Create Date: 2026-10-17 18:42:11.507316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c9e15b42'
+down_revision: Union[str, None] = '8e2f4a61c07d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The old unique index let the uncategorized bucket of a month exist
+    # more than once (concurrent first writes, deleted categories), and
+    # every later delta was added to each copy. Recompute those buckets
+    # from the transactions rather than trying to merge the copies
+    op.drop_index('ix_monthly_rollups_owner_id_month_type_category_id', table_name='monthly_rollups')
+    op.execute("DELETE FROM monthly_rollups WHERE category_id IS NULL")
+    op.execute("""
+        INSERT INTO monthly_rollups (owner_id, month, type, category_id, total, count)
+        SELECT owner_id, CAST(date_trunc('month', date AT TIME ZONE 'UTC') AS DATE), type, NULL, SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE owner_id IS NOT NULL AND date IS NOT NULL AND type IS NOT NULL AND category_id IS NULL
+        GROUP BY owner_id, CAST(date_trunc('month', date AT TIME ZONE 'UTC') AS DATE), type
+    """)
+    # Same expression as models.ROLLUP_BUCKET
+    op.create_index(
+        'ix_monthly_rollups_owner_id_month_type_category_key', 'monthly_rollups',
+        ['owner_id', 'month', 'type', sa.text('coalesce(category_id, 0)')], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monthly_rollups_owner_id_month_type_category_key', table_name='monthly_rollups')
+    op.create_index('ix_monthly_rollups_owner_id_month_type_category_id', 'monthly_rollups',
+                    ['owner_id', 'month', 'type', 'category_id'], unique=True)
@@ -0,0 +1,31 @@
+"""Drop unscoped transaction indexes
+
+Revision ID: f41c8b2d6e07
+Revises: d3a7c9e15b42
+Create Date: 2026-10-17 21:05:37.240918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41c8b2d6e07'
+down_revision: Union[str, None] = 'd3a7c9e15b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The dashboard is scoped to its owner now and reads through the
+    # owner_id-leading indexes; nothing else filters transactions across owners
+    op.drop_index('ix_transactions_date', table_name='transactions')
+    op.drop_index('ix_transactions_type_date', table_name='transactions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_transactions_type_date', 'transactions', ['type', 'date'], unique=False,
+                    postgresql_include=['amount', 'category_id'])
+    op.create_index('ix_transactions_date', 'transactions', ['date'], unique=False)
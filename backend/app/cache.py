@@ -0,0 +1,173 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response, status
+
+from . import serialization
+from .config import settings
+
+
+class MemoryBackend:
+    """In-process LRU with a TTL per entry.
+
+    Versions live outside the LRU so they are never evicted, and carry a
+    per-process token so ETags issued before a restart cannot match again.
+    Each worker process has its own copy; use the Redis backend when the
+    API runs with more than one worker.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions = {}
+        self._token = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, owner_id: int) -> str:
+        with self._lock:
+            return f"{self._token}.{self._versions.get(owner_id, 0)}"
+
+    def bump_version(self, owner_id: int) -> None:
+        with self._lock:
+            self._versions[owner_id] = self._versions.get(owner_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same versions and entries.
+
+    Versions carry a token stored next to them, like MemoryBackend's
+    per-process one: when the keys are flushed the counters start again at
+    0 under a new token, so ETags issued before cannot match.
+    """
+
+    def __init__(self, url: str, ttl: float = 300.0, prefix: str = "wallet:cache"):
+        # Imported here so the memory backend does not pay for it at startup
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._token_key = f"{prefix}:token"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._redis.get(f"{self.prefix}:entry:{key}")
+
+    def set(self, key: str, value: bytes) -> None:
+        self._redis.set(f"{self.prefix}:entry:{key}", value, ex=int(self.ttl))
+
+    def version(self, owner_id: int) -> str:
+        token, version = self._redis.mget(self._token_key, f"{self.prefix}:version:{owner_id}")
+        if token is None:
+            # First use, or the keys were flushed; the first worker to get here sets it
+            self._redis.set(self._token_key, uuid.uuid4().hex[:8], nx=True)
+            token = self._redis.get(self._token_key)
+        return f"{token.decode()}.{(version or b'0').decode()}"
+
+    def bump_version(self, owner_id: int) -> None:
+        self._redis.incr(f"{self.prefix}:version:{owner_id}")
+
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(f"{self.prefix}:*"):
+            self._redis.delete(key)
+
+
+def _backend_from_settings():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, ttl=settings.CACHE_TTL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL)
+    raise ValueError(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r}")
+
+
+backend = _backend_from_settings()
+
+
+def bump_version(owner_id: int) -> None:
+    """Invalidate every cached response of the owner; call after each committed write"""
+    backend.bump_version(owner_id)
+
+
+def _request_key(request: Request) -> str:
+    target = f"{request.url.path}?{request.url.query}"
+    return hashlib.sha1(target.encode()).hexdigest()[:16]
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match against etag: "*" or any listed tag, compared weakly (W/ ignored)"""
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def _lookup(request: Request, owner_id: int):
+    version = backend.version(owner_id)
+    request_key = _request_key(request)
+    etag = f'W/"{version}-{request_key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(etag, request.headers.get("if-none-match", "")):
+        # Nothing changed since the client's copy: answer without touching the DB
+        return None, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), headers
+    key = f"{owner_id}:{version}:{request_key}"
+    body = backend.get(key)
+    if body is not None:
+        return key, Response(body, media_type="application/json", headers=headers), headers
+    return key, None, headers
+
+
+def _store(key: str, headers: dict, data: Any, response_model: Any) -> Response:
+    body = serialization.dump_json(response_model, data)
+    backend.set(key, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cached_response(request: Request, owner_id: int, response_model: Any, build: Callable[[], Any]) -> Response:
+    """Serve build()'s result through the owner's versioned cache, with ETag/304.
+
+    build() only runs on a miss; its result is serialized with response_model.
+    """
+    key, response, headers = _lookup(request, owner_id)
+    if response is not None:
+        return response
+    return _store(key, headers, build(), response_model)
+
+
+async def cached_response_async(
+    request: Request, owner_id: int, response_model: Any, build: Callable[[], Awaitable[Any]]
+) -> Response:
+    """cached_response for async handlers"""
+    key, response, headers = _lookup(request, owner_id)
+    if response is not None:
+        return response
+    return _store(key, headers, await build(), response_model)
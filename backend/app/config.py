@@ -6,6 +6,34 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"  # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Connection pool (applies to the sync and the async engine alike)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+
+    # Response cache for read endpoints: "memory" is per process, use
+    # "redis" (a shared Redis server) when running several workers
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL: float = 300.0  # seconds
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # SQL instrumentation: DEBUG adds X-DB-Query-Count/X-DB-Query-Time-Ms
+    # headers; slow statements are logged with their plan and statements
+    # repeated this often within one request are logged as likely N+1
+    DEBUG: bool = False
+    SLOW_QUERY_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Schema step run by the app's lifespan, not at import: "create_all"
+    # creates missing tables, "migrate" runs `alembic upgrade head`, "none"
+    # skips it. WARMUP_ON_STARTUP fills the connection pools and serializer
+    # caches before the first request is accepted
+    SCHEMA_ON_STARTUP: str = "create_all"
+    WARMUP_ON_STARTUP: bool = False
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,74 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg / aiosqlite)"""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def get_pool_options(database_url: str, poolclass, logging_name: str) -> dict:
+    """Pool settings from config.
+
+    SQLite keeps the kind of pool its dialect picks, instrumented when that
+    is the one poolclass extends (QueuePool for a file); NullPool and the
+    in-memory pools go without checkout metrics.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        options = {"pool_logging_name": logging_name}
+        if issubclass(poolclass, url.get_dialect().get_pool_class(url)):
+            options["poolclass"] = poolclass
+        return options
+    return {
+        "poolclass": poolclass,
+        "pool_logging_name": logging_name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def get_connect_args(database_url: str, is_async: bool = False) -> dict:
+    """Pin Postgres sessions to UTC.
+
+    Month and day buckets are UTC calendar dates, computed by date_trunc in
+    the session timezone and by time_buckets in Python; both must agree
+    whatever the server's default timezone is.
+    """
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return {}
+    if is_async:
+        return {"server_settings": {"timezone": "UTC"}}
+    return {"options": "-c timezone=UTC"}
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=get_connect_args(SQLALCHEMY_DATABASE_URL),
+    **get_pool_options(SQLALCHEMY_DATABASE_URL, InstrumentedQueuePool, "sync")
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=get_connect_args(SQLALCHEMY_DATABASE_URL, is_async=True),
+    **get_pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool, "async")
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -16,3 +77,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
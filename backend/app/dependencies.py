@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import get_db, get_async_db
+
+DEFAULT_USER_EMAIL = "default@example.com"
+DEFAULT_USER_NAME = "Default User"
+
+# The app is single user: the current user is looked up (or created) once
+# per process and served from here until invalidate_current_user() is called.
+_current_user: Optional[models.User] = None
+_current_user_lock = threading.Lock()
+_current_user_async_lock = asyncio.Lock()
+
+
+def _first_user_query():
+    return select(models.User).order_by(models.User.id).limit(1)
+
+
+def _new_default_user() -> models.User:
+    return models.User(email=DEFAULT_USER_EMAIL, full_name=DEFAULT_USER_NAME, is_active=True)
+
+
+def invalidate_current_user() -> None:
+    """Drop the cached user so the next request reloads it"""
+    global _current_user
+    _current_user = None
+
+
+def _load_or_create_user(db: Session) -> models.User:
+    user = db.execute(_first_user_query()).scalar_one_or_none()
+    if user is None:
+        try:
+            user = _new_default_user()
+            db.add(user)
+            db.commit()
+        except IntegrityError:
+            # Another worker created the default user first
+            db.rollback()
+            user = db.execute(_first_user_query()).scalar_one()
+        db.refresh(user)
+    # Detach it so it can outlive this session and be shared between requests
+    db.expunge(user)
+    return user
+
+
+def get_current_user(db: Session = Depends(get_db)) -> models.User:
+    """Current user for sync handlers, created on first use"""
+    global _current_user
+    user = _current_user
+    if user is not None:
+        return user
+    with _current_user_lock:
+        if _current_user is None:
+            _current_user = _load_or_create_user(db)
+        return _current_user
+
+
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db)) -> models.User:
+    """Current user for async handlers, sharing the cache with get_current_user"""
+    global _current_user
+    user = _current_user
+    if user is not None:
+        return user
+    async with _current_user_async_lock:
+        if _current_user is None:
+            _current_user = await db.run_sync(_load_or_create_user)
+        return _current_user
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+
+from . import schemas, serialization
+from .config import settings
+from .database import Base, async_engine, engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Arbitrary key for pg_advisory_xact_lock, so that of several workers
+# starting at once only one runs the migrations
+MIGRATION_LOCK_ID = 7_305_512_846
+
+# Response models served through the cache; building their TypeAdapters
+# up front keeps that cost off the first request to each endpoint
+CACHED_RESPONSE_MODELS = [
+    List[schemas.BudgetSummary],
+    List[schemas.CategoryResponse],
+    schemas.DashboardResponse,
+    schemas.DashboardData,
+    schemas.DetailedReport,
+    List[schemas.TrendPoint],
+]
+
+
+def _migrate() -> None:
+    # Alembic is only needed for this mode, so it is not imported at startup otherwise
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        inspector = inspect(connection)
+        if not inspector.has_table("alembic_version") and inspector.has_table("transactions"):
+            logger.error(
+                "Database has tables but no alembic_version (it was created with create_all); "
+                "run `alembic stamp <revision>` for the revision it matches. Skipping migrations."
+            )
+            return
+        # env.py runs the migrations on this connection, inside the locked transaction
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+
+def sync_schema(mode: str = None) -> None:
+    """Bring the database schema up to date according to SCHEMA_ON_STARTUP.
+
+    "create_all" creates missing tables (and never alters existing ones),
+    "migrate" runs `alembic upgrade head`, "none" leaves the schema alone
+    for deployments that migrate in a release step.
+    """
+    mode = mode or settings.SCHEMA_ON_STARTUP
+    if mode == "none":
+        return
+    if mode == "create_all":
+        Base.metadata.create_all(bind=engine)
+    elif mode == "migrate":
+        _migrate()
+    else:
+        raise ValueError(f"Unknown SCHEMA_ON_STARTUP mode: {mode!r}")
+
+
+def _pool_size(pool) -> int:
+    return pool.size() if isinstance(pool, QueuePool) else 1
+
+
+def _open_sync_connections() -> None:
+    # Hold them all at once, otherwise the pool just hands out the same one again
+    connections = []
+    try:
+        for _ in range(_pool_size(engine.pool)):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warmup() -> None:
+    """Fill both connection pools and build the mapper and serializer state
+    the first requests would otherwise pay for"""
+    await run_in_threadpool(_open_sync_connections)
+
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(*(
+            stack.enter_async_context(async_engine.connect()) for _ in range(_pool_size(async_engine.pool))
+        ))
+        await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in connections))
+
+    configure_mappers()
+    for response_model in CACHED_RESPONSE_MODELS:
+        serialization.adapter(response_model)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await run_in_threadpool(sync_schema)
+    if settings.WARMUP_ON_STARTUP:
+        await warmup()
+    logger.info("Startup finished in %.0f ms", (time.perf_counter() - started) * 1000)
+    yield
+    engine.dispose()
+    await async_engine.dispose()
@@ -1,20 +1,21 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import accounts, categories, transactions, budgets, router
+from fastapi.responses import ORJSONResponse
+from .routers import accounts, categories, transactions, budgets, system, router
+from . import metrics, query_stats
+from .lifespan import lifespan
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="Personal Finance Manager",
     description="A simple personal finance management API for tracking expenses, income, and budgets",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -35,11 +36,17 @@ app.add_middleware(
     max_age=3600,
 )
 
+app.add_middleware(query_stats.QueryStatsMiddleware)
+# Outermost, so the latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(accounts.router, prefix="/api/accounts", tags=["Accounts"])
 app.include_router(categories.router, prefix="/api/categories", tags=["Categories"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["Transactions"])
 app.include_router(budgets.router, prefix="/api/budgets", tags=["Budgets"])
+app.include_router(system.router, prefix="/api/system", tags=["System"])
+app.include_router(metrics.router, tags=["System"])
 
 # Include the main router
 app.include_router(router, prefix="/api")
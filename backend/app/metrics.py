@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+
+from .database import async_engine, engine
+from .pool_metrics import get_pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Requests that matched no route share one label so that scanners probing
+# random paths cannot blow up the number of series
+UNMATCHED = "unmatched"
+
+# Starlette appends "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense; callers hold the lock"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # First bucket whose upper bound is >= value; larger values only land in +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_format_value(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class RequestMetrics:
+    """Per-route request accounting for one worker process.
+
+    Like the in-memory cache, every worker keeps its own numbers; Prometheus
+    scrapes each worker (or sums them) when the API runs with several.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.sizes: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str, str], int] = {}
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.sizes[key] = Histogram(SIZE_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.sizes[key].observe(size)
+            status_key = (method, route, str(status))
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being served",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Requests served, by route and status code",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.statuses.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+            lines += _histogram_lines(
+                "http_request_duration_seconds", "Time from request to last response byte", self.latency
+            )
+            lines += _histogram_lines("http_response_size_bytes", "Response body size", self.sizes)
+            return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self.latency.clear()
+            self.sizes.clear()
+            self.statuses.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return f"{value:.1f}"
+    return str(value)
+
+
+def _histogram_lines(name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum!r}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records latency, status and size per route template.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streaming
+    responses pass through untouched and are timed to their last byte.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+        self._templates: Dict[Any, str] = {}
+
+    def _route(self, scope) -> str:
+        # The router leaves the matched endpoint in the scope; map it back to
+        # the path template so /api/accounts/1 and /api/accounts/2 share a series
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED
+        if endpoint not in self._templates:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is not None:
+                    self._templates.setdefault(route.endpoint, route.path)
+        return self._templates.get(endpoint, UNMATCHED)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.finished(
+                scope["method"], self._route(scope), status, time.perf_counter() - start, size
+            )
+
+
+def _pool_lines() -> List[str]:
+    # The pool status of /api/system/pool, as gauges and counters
+    gauges = {
+        "db_pool_checked_out": ("Connections currently checked out", lambda pool: pool.checkedout()),
+        "db_pool_checked_in": ("Idle connections in the pool", lambda pool: pool.checkedin()),
+        "db_pool_overflow": ("Connections open beyond pool_size", lambda pool: max(pool.overflow(), 0)),
+    }
+    counters = {
+        "db_pool_checkouts_total": ("Connection checkouts", "checkouts"),
+        "db_pool_checkout_timeouts_total": ("Checkouts that timed out waiting for a connection", "timeouts"),
+        "db_pool_checkout_wait_seconds_total": ("Time spent waiting for a connection", "wait_seconds_total"),
+    }
+    pools = [("sync", engine.pool), ("async", async_engine.pool)]
+    lines = []
+    for name, (help_text, read) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for pool_name, pool in pools:
+            if isinstance(pool, QueuePool):
+                lines.append(f"{name}{_labels(pool=pool_name)} {read(pool)}")
+    for name, (help_text, field) in counters.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for pool_name, _ in pools:
+            lines.append(f"{name}{_labels(pool=pool_name)} {get_pool_stats(pool_name).snapshot()[field]}")
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    return "\n".join(request_metrics.render() + _pool_lines()) + "\n"
+
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
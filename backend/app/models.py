@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Numeric, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Enum, Numeric, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from .database import Base
+from .money import Money
 
 class TransactionType(str, enum.Enum):
     INCOME = "income"
@@ -29,11 +30,11 @@ class Account(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     type = Column(Enum(AccountType))
-    balance = Column(Float, default=0.0)
+    balance = Column(Money, default=0)
     currency = Column(String, default="USD")
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
 
     owner = relationship("User", back_populates="accounts")
     transactions = relationship("Transaction", back_populates="account")
@@ -46,7 +47,7 @@ class Category(Base):
     type = Column(Enum(TransactionType))
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
 
     owner = relationship("User", back_populates="categories")
     transactions = relationship("Transaction", back_populates="category")
@@ -56,7 +57,7 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float)
+    amount = Column(Money)
     type = Column(Enum(TransactionType))
     description = Column(String, nullable=True)
     date = Column(DateTime(timezone=True), server_default=func.now())
@@ -68,22 +69,92 @@ class Transaction(Base):
     account = relationship("Account", back_populates="transactions")
     owner = relationship("User", back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_transactions_owner_id_date_id", "owner_id", "date", "id"),
+        Index("ix_transactions_owner_id_type_date", "owner_id", "type", "date",
+              postgresql_include=["amount", "category_id"]),
+        Index("ix_transactions_owner_id_category_id_date", "owner_id", "category_id", "date",
+              postgresql_include=["amount", "type"]),
+        Index("ix_transactions_category_id_date", "category_id", "date",
+              postgresql_include=["amount", "type"]),
+        Index("ix_transactions_account_id_date", "account_id", "date",
+              postgresql_include=["amount", "type"]),
+    )
+
+def search_vector(description):
+    """Postgres tsvector of a description; 'simple' lowercases without stemming"""
+    return func.to_tsvector(text("'simple'::regconfig"), func.coalesce(description, text("''")))
+
+# Full-text search over descriptions, on Postgres only; SQLite searches
+# through the in-process index of search_service. Queries must use this
+# same expression for the planner to match it to the GIN index
+TRANSACTION_SEARCH_VECTOR = search_vector(Transaction.description)
+Index("ix_transactions_description_search", TRANSACTION_SEARCH_VECTOR,
+      postgresql_using="gin").ddl_if(dialect="postgresql")
+
 class Budget(Base):
     __tablename__ = "budgets"
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float)
-    spent = Column(Float, default=0.0)
+    amount = Column(Money)
+    spent = Column(Money, default=0)
     start_date = Column(DateTime(timezone=True))
     end_date = Column(DateTime(timezone=True))
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"))
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     notification_threshold = Column(Float, default=0.8)
+    threshold_crossed_at = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True)
 
     category = relationship("Category", back_populates="budgets")
     owner = relationship("User", back_populates="budgets")
 
+    __table_args__ = (
+        Index("ix_budgets_owner_id_category_id", "owner_id", "category_id"),
+    )
+
+class MonthlyRollup(Base):
+    """Per-owner monthly totals, maintained alongside transaction writes"""
+    __tablename__ = "monthly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    total = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+# One row per bucket. Uncategorized totals are keyed as category 0: a plain
+# unique index treats NULLs as distinct and would let the uncategorized
+# bucket be inserted twice. Upserts name this key as their conflict target
+ROLLUP_BUCKET = (
+    MonthlyRollup.owner_id,
+    MonthlyRollup.month,
+    MonthlyRollup.type,
+    func.coalesce(MonthlyRollup.category_id, text("0")),
+)
+Index("ix_monthly_rollups_owner_id_month_type_category_key", *ROLLUP_BUCKET, unique=True)
+
+class AccountBalanceSnapshot(Base):
+    """Per-account month-end checkpoint, maintained alongside transaction writes.
+
+    closing_balance is the net of the account's transactions (income minus
+    expenses) up to the end of month; Account.balance, the opening balance,
+    is not included. Every month in which the account has transactions has
+    a checkpoint.
+    """
+    __tablename__ = "account_balance_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)
+    closing_balance = Column(Money, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_account_balance_snapshots_account_id_month", "account_id", "month", unique=True),
+    )
+
 User.accounts = relationship("Account", back_populates="owner")
 User.categories = relationship("Category", back_populates="owner")
 User.transactions = relationship("Transaction", back_populates="owner")
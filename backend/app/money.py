@@ -0,0 +1,52 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Union
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+MoneyValue = Union[Decimal, int, float, str]
+
+
+def to_cents(value: MoneyValue) -> int:
+    """Amount in major units (Decimal, int, float or str) to integer minor units"""
+    if isinstance(value, float):
+        # Go through str so 0.1 becomes 10 cents rather than 10.000000000000000555
+        value = str(value)
+    return int((Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)) * 100)
+
+
+def from_cents(cents: Union[int, Decimal]) -> Decimal:
+    """Integer minor units to a Decimal with two places"""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class Money(TypeDecorator):
+    """Money stored as a BIGINT count of cents.
+
+    Python sees Decimal with two places; the conversion happens once when
+    binding and once per result value. SUM() over a Money column adds
+    integers in the database and comes back as Money as well, so totals are
+    exact.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[MoneyValue], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_literal_param(self, value: Optional[MoneyValue], dialect) -> str:
+        return "NULL" if value is None else str(to_cents(value))
+
+    def process_result_value(self, value, dialect) -> Optional[Decimal]:
+        if value is None:
+            return None
+        return from_cents(value)
+
+    @property
+    def python_type(self):
+        return Decimal
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStats:
+    """Running checkout counters for one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+# Keyed by the pool's logging name, which survives engine.dispose()/pool.recreate()
+_pool_stats: Dict[str, PoolStats] = {}
+_pool_stats_lock = threading.Lock()
+
+
+def get_pool_stats(name: str) -> PoolStats:
+    with _pool_stats_lock:
+        if name not in _pool_stats:
+            _pool_stats[name] = PoolStats()
+        return _pool_stats[name]
+
+
+class _InstrumentedPoolMixin:
+    def _do_get(self):
+        stats = get_pool_stats(self._orig_logging_name or "default")
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool that records how long checkouts wait and how often they time out"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool counterpart of InstrumentedQueuePool"""
+
+
+def pool_status(name: str, pool: Pool) -> Dict[str, Any]:
+    """Point-in-time usage of a pool together with its checkout history.
+
+    Only the instrumented pools count checkouts; for any other (SQLite's
+    NullPool or in-memory pools) metrics_available is false and no
+    counters are reported rather than zeros.
+    """
+    instrumented = isinstance(pool, _InstrumentedPoolMixin)
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__, "metrics_available": instrumented}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if instrumented:
+        status.update(get_pool_stats(name).snapshot())
+    return status
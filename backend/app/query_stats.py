@@ -0,0 +1,134 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueries:
+    """Statements executed while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Keyed by SQL text, so the same statement with different parameters
+        # (a lazy load per row, typically) counts as a repeat
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# Set per request by QueryStatsMiddleware. Sync endpoints run in the
+# threadpool with a copy of the context, which still points at the same
+# RequestQueries object, so their queries are counted too
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    # A separate DBAPI cursor, so the result set of the slow statement is not
+    # disturbed; plain EXPLAIN does not execute the statement again
+    dbapi_connection = conn.connection.dbapi_connection
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # On Postgres a failed statement aborts the whole transaction; the
+    # savepoint keeps a failed EXPLAIN from taking the request down with it
+    savepoint = conn.dialect.name == "postgresql" and not getattr(dbapi_connection, "autocommit", False)
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT query_stats_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = cursor.fetchall()
+        finally:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                cursor.execute("RELEASE SAVEPOINT query_stats_explain")
+    finally:
+        cursor.close()
+    return "\n".join(" ".join(str(column) for column in row) for row in plan)
+
+
+_READ = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, elapsed)
+
+    if elapsed * 1000 < settings.SLOW_QUERY_MS:
+        return
+    plan = "(only available for single SELECT statements)"
+    if not executemany and _READ.match(statement):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as exc:  # the plan is best effort; never fail the query over it
+            plan = f"(EXPLAIN failed: {exc})"
+    logger.warning("Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n%s",
+                   elapsed * 1000, statement, parameters, plan)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+class QueryStatsMiddleware:
+    """Count queries and DB time per request and flag likely N+1 patterns.
+
+    With DEBUG on, the totals are sent as X-DB-Query-Count and
+    X-DB-Query-Time-Ms response headers. Headers go out with the first
+    byte, so for streaming responses they only cover the queries made
+    before it; the N+1 check runs once the response is complete.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(queries.count).encode()),
+                    (b"x-db-query-time-ms", f"{queries.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for statement, count in queries.repeated(settings.N_PLUS_ONE_THRESHOLD):
+                logger.warning("Possible N+1 in %s %s: statement ran %d times: %s",
+                               scope["method"], scope["path"], count, statement)
@@ -1,69 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
-from .. import models
-from ..schemas import AccountCreate, AccountResponse
+from datetime import datetime, timedelta
+from typing import List, Optional
+from .. import cache, models, serialization
+from ..schemas import AccountBalance, AccountCreate, AccountResponse, NetWorthPoint
 from ..database import get_db
+from ..dependencies import get_current_user
+from ..services import balance_service
 
 router = APIRouter()
 
-def get_or_create_default_user(db: Session):
-    # Try to get the default user
-    user = db.query(models.User).first()
-    if not user:
-        # Create a default user if none exists
-        user = models.User(
-            email="default@example.com",
-            full_name="Default User"
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
-
 @router.post("/", response_model=AccountResponse)
-def create_account(account: AccountCreate, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-
+def create_account(account: AccountCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Create account with owner
     db_account = models.Account(
         name=account.name,
         type=account.type,
-        balance=float(account.balance),
+        balance=account.balance,
         currency=account.currency,
         description=account.description,
         owner_id=user.id
     )
     db.add(db_account)
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_account)
     return db_account
 
 @router.get("/", response_model=List[AccountResponse])
-def get_accounts(db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def get_accounts(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Get accounts for this user
     accounts = db.query(models.Account).filter(models.Account.owner_id == user.id).all()
-    return accounts
+    return serialization.json_response(List[AccountResponse], accounts)
+
+@router.get("/net-worth", response_model=List[NetWorthPoint])
+def get_net_worth(
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    # Net worth at each month boundary, read from the balance checkpoints
+    end_date = end_date or datetime.now()
+    start_date = start_date or end_date - timedelta(days=365)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    accounts = db.query(models.Account).filter(models.Account.owner_id == user.id).all()
+    return [
+        NetWorthPoint(date=date, net_worth=net_worth)
+        for date, net_worth in balance_service.net_worth_series(db, accounts, start_date, end_date)
+    ]
 
 @router.get("/{account_id}", response_model=AccountResponse)
-def get_account(account_id: int, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def get_account(account_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     account = db.query(models.Account).filter(models.Account.id == account_id, models.Account.owner_id == user.id).first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
+@router.get("/{account_id}/balance", response_model=AccountBalance)
+def get_account_balance(
+    account_id: int,
+    as_of: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    account = db.query(models.Account).filter(models.Account.id == account_id, models.Account.owner_id == user.id).first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    as_of = as_of or datetime.now()
+    balance = balance_service.balances_as_of(db, [account], as_of)[account.id]
+    return AccountBalance(account_id=account.id, as_of=as_of, balance=balance)
+
 @router.put("/{account_id}", response_model=AccountResponse)
-def update_account(account_id: int, account: AccountCreate, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def update_account(account_id: int, account: AccountCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_account = db.query(models.Account).filter(models.Account.id == account_id, models.Account.owner_id == user.id).first()
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
@@ -71,23 +81,22 @@ def update_account(account_id: int, account: AccountCreate, db: Session = Depend
     # Update account fields
     db_account.name = account.name
     db_account.type = account.type
-    db_account.balance = float(account.balance)
+    db_account.balance = account.balance
     db_account.currency = account.currency
     db_account.description = account.description
     
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_account)
     return db_account
 
 @router.delete("/{account_id}")
-def delete_account(account_id: int, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def delete_account(account_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_account = db.query(models.Account).filter(models.Account.id == account_id, models.Account.owner_id == user.id).first()
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
     
     db.delete(db_account)
     db.commit()
+    cache.bump_version(user.id)
     return {"message": "Account deleted successfully"}
@@ -1,67 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import datetime
-from .. import models, schemas
+from .. import cache, models, schemas, serialization
 from ..database import get_db
+from ..dependencies import get_current_user
+from ..services import budget_service
+from ..utils.time_buckets import utc_now
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.BudgetResponse)
-def create_budget(budget: schemas.BudgetCreate, db: Session = Depends(get_db)):
+def create_budget(budget: schemas.BudgetCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_budget = models.Budget(**budget.dict())
     db.add(db_budget)
+    db.flush()
+    # Start from the spend already recorded in the budget window
+    budget_service.refresh_spent(db, models.Budget.id == db_budget.id)
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_budget)
     return db_budget
 
 @router.get("/", response_model=List[schemas.BudgetResponse])
 def get_budgets(db: Session = Depends(get_db)):
     budgets = db.query(models.Budget).all()
-    return budgets
+    return serialization.json_response(List[schemas.BudgetResponse], budgets)
 
 @router.get("/notifications", response_model=List[schemas.BudgetNotification])
 def get_budget_notifications(db: Session = Depends(get_db)):
-    current_time = datetime.utcnow()
-    active_budgets = db.query(models.Budget).filter(
+    # spent and threshold_crossed_at are kept current by transaction writes
+    rows = db.execute(budget_service.notifications_query(utc_now())).all()
+
+    return [
+        {
+            "budget_id": budget.id,
+            "category_name": category_name,
+            "amount_spent": budget.spent,
+            "budget_amount": budget.amount,
+            "percentage_used": budget.spent / budget.amount,
+            "notification_threshold": budget.notification_threshold,
+            "threshold_crossed_at": budget.threshold_crossed_at
+        }
+        for budget, category_name in rows
+    ]
+
+@router.get("/summary", response_model=List[schemas.BudgetSummary])
+def get_budget_summary(request: Request, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+    return cache.cached_response(request, user.id, List[schemas.BudgetSummary], lambda: _budget_summaries(db))
+
+def _budget_summaries(db: Session):
+    current_time = utc_now()
+    is_active = and_(
         models.Budget.start_date <= current_time,
         models.Budget.end_date >= current_time
+    ).label('is_active')
+    rows = db.execute(
+        select(models.Budget, models.Category.name, is_active)
+        .outerjoin(models.Category, models.Category.id == models.Budget.category_id)
+        .order_by(models.Budget.id)
     ).all()
-    
-    notifications = []
-    for budget in active_budgets:
-        spent = sum(t.amount for t in budget.transactions)
-        percentage = spent / budget.amount
-        if percentage >= budget.notification_threshold:
-            notifications.append({
-                "budget_id": budget.id,
-                "category_name": budget.category.name,
-                "amount_spent": spent,
-                "budget_amount": budget.amount,
-                "percentage_used": percentage,
-                "notification_threshold": budget.notification_threshold
-            })
-    return notifications
 
-@router.get("/summary", response_model=List[schemas.BudgetSummary])
-def get_budget_summary(db: Session = Depends(get_db)):
-    current_time = datetime.utcnow()
-    budgets = db.query(models.Budget).all()
-    
     summaries = []
-    for budget in budgets:
-        spent = sum(t.amount for t in budget.transactions)
+    for budget, category_name, is_active in rows:
+        spent = budget.spent or 0
         percentage = spent / budget.amount if budget.amount > 0 else 0
-        is_active = budget.start_date <= current_time <= budget.end_date
         summaries.append({
             "budget_id": budget.id,
-            "category_name": budget.category.name,
+            "category_name": category_name,
             "amount_spent": spent,
             "budget_amount": budget.amount,
             "percentage_used": percentage,
             "start_date": budget.start_date,
             "end_date": budget.end_date,
-            "is_active": is_active
+            "is_active": bool(is_active)
         })
     return summaries
 
@@ -73,24 +85,29 @@ def get_budget(budget_id: int, db: Session = Depends(get_db)):
     return budget
 
 @router.put("/{budget_id}", response_model=schemas.BudgetResponse)
-def update_budget(budget_id: int, budget_update: schemas.BudgetBase, db: Session = Depends(get_db)):
+def update_budget(budget_id: int, budget_update: schemas.BudgetBase, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_budget = db.query(models.Budget).filter(models.Budget.id == budget_id).first()
     if not db_budget:
         raise HTTPException(status_code=404, detail="Budget not found")
     
     for key, value in budget_update.dict(exclude_unset=True).items():
         setattr(db_budget, key, value)
-    
+    db.flush()
+    # The category or window may have changed, so recompute rather than adjust
+    budget_service.refresh_spent(db, models.Budget.id == budget_id)
+
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_budget)
     return db_budget
 
 @router.delete("/{budget_id}")
-def delete_budget(budget_id: int, db: Session = Depends(get_db)):
+def delete_budget(budget_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_budget = db.query(models.Budget).filter(models.Budget.id == budget_id).first()
     if not db_budget:
         raise HTTPException(status_code=404, detail="Budget not found")
     
     db.delete(db_budget)
     db.commit()
+    cache.bump_version(user.id)
     return {"message": "Budget deleted successfully"}
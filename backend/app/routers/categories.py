@@ -1,9 +1,11 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
-from .. import models, schemas
+from .. import cache, models, schemas
 from ..database import get_db
+from ..dependencies import get_current_user
+from ..services import rollup_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,11 +14,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/", response_model=schemas.CategoryResponse)
-def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
+def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     try:
         db_category = models.Category(**category.dict())
         db.add(db_category)
         db.commit()
+        cache.bump_version(user.id)
         db.refresh(db_category)
         return db_category
     except Exception as e:
@@ -28,10 +31,11 @@ def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_
         )
 
 @router.get("/", response_model=List[schemas.CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     try:
-        categories = db.query(models.Category).all()
-        return categories
+        return cache.cached_response(
+            request, user.id, List[schemas.CategoryResponse], lambda: db.query(models.Category).all()
+        )
     except Exception as e:
         logger.error(f"Error getting categories: {str(e)}")
         raise HTTPException(
@@ -56,7 +60,7 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
         )
 
 @router.put("/{category_id}", response_model=schemas.CategoryResponse)
-def update_category(category_id: int, category: schemas.CategoryCreate, db: Session = Depends(get_db)):
+def update_category(category_id: int, category: schemas.CategoryCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     try:
         db_category = db.query(models.Category).filter(models.Category.id == category_id).first()
         if not db_category:
@@ -66,6 +70,7 @@ def update_category(category_id: int, category: schemas.CategoryCreate, db: Sess
             setattr(db_category, key, value)
         
         db.commit()
+        cache.bump_version(user.id)
         db.refresh(db_category)
         return db_category
     except HTTPException:
@@ -79,14 +84,16 @@ def update_category(category_id: int, category: schemas.CategoryCreate, db: Sess
         )
 
 @router.delete("/{category_id}")
-def delete_category(category_id: int, db: Session = Depends(get_db)):
+def delete_category(category_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     try:
         db_category = db.query(models.Category).filter(models.Category.id == category_id).first()
         if not db_category:
             raise HTTPException(status_code=404, detail="Category not found")
         
+        rollup_service.fold_category(db, db_category.id)
         db.delete(db_category)
         db.commit()
+        cache.bump_version(user.id)
         return {"message": "Category deleted successfully"}
     except HTTPException:
         raise
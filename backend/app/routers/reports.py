@@ -1,133 +1,134 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from datetime import datetime
+from sqlalchemy import func, select
+from typing import List, Optional
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 from ..database import get_db
-from .. import models, schemas
+from ..dependencies import get_current_user
+from .. import cache, models, schemas, serialization
+from ..services import export_service, report_service
+from ..utils.time_buckets import bucket_count
 
 router = APIRouter()
 
 @router.post("/", response_model=List[schemas.TransactionResponse])
 def generate_report(
     params: schemas.ReportParams,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
 ):
-    # Get the default user
-    user = db.query(models.User).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(models.Transaction).filter(
-        models.Transaction.owner_id == user.id,
-        models.Transaction.date >= params.start_date,
-        models.Transaction.date <= params.end_date
+    # Plain column rows: building ORM objects for a large report costs more
+    # than serializing it
+    rows = db.execute(
+        select(*export_service.EXPORT_COLUMNS).where(*export_service.report_filters(params, user.id))
+    ).mappings()
+    return serialization.json_response(List[schemas.TransactionResponse], [dict(row) for row in rows])
+
+@router.post("/export")
+def export_report(
+    params: schemas.ReportParams,
+    file_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """Same transactions as generate_report, streamed as CSV, NDJSON or Parquet"""
+    if file_format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export requires pyarrow")
+    return StreamingResponse(
+        export_service.export_report(db, params, user.id, file_format),
+        media_type=export_service.MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_service.export_filename(params, file_format)}"'}
     )
 
-    if params.account_ids:
-        query = query.filter(models.Transaction.account_id.in_(params.account_ids))
-    if params.category_ids:
-        query = query.filter(models.Transaction.category_id.in_(params.category_ids))
-    if params.transaction_type:
-        query = query.filter(models.Transaction.type == params.transaction_type)
-
-    return query.all()
+@router.post("/detailed", response_model=schemas.FinancialReport)
+def generate_detailed_report(
+    params: schemas.ReportParams,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """Totals, monthly trends and per-category and per-account breakdowns for the report params"""
+    if params.start_date > params.end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    return report_service.generate_detailed_report(
+        db, user.id, params.start_date, params.end_date, account_ids=params.account_ids,
+        category_ids=params.category_ids, transaction_type=params.transaction_type
+    )
 
 @router.get("/summary", response_model=schemas.DetailedReport)
 def get_summary(
+    request: Request,
     start_date: datetime,
     end_date: datetime,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
 ):
-    # Get the default user
-    user = db.query(models.User).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    return cache.cached_response(
+        request, user.id, schemas.DetailedReport, lambda: _build_summary(db, user.id, start_date, end_date)
+    )
 
-    transactions = db.query(models.Transaction).filter(
-        models.Transaction.owner_id == user.id,
+def _build_summary(db: Session, user_id: int, start_date: datetime, end_date: datetime):
+    in_range = (
+        models.Transaction.owner_id == user_id,
         models.Transaction.date >= start_date,
         models.Transaction.date <= end_date
-    ).all()
+    )
+    transactions = db.query(models.Transaction).filter(*in_range).all()
+    # Exact integer-cent sums in the database instead of Python passes over the rows
+    totals = dict(
+        db.query(models.Transaction.type, func.coalesce(func.sum(models.Transaction.amount), 0))
+        .filter(*in_range)
+        .group_by(models.Transaction.type)
+        .all()
+    )
 
-    total_income = sum(t.amount for t in transactions if t.type == models.TransactionType.INCOME)
-    total_expenses = sum(t.amount for t in transactions if t.type == models.TransactionType.EXPENSE)
+    total_income = totals.get(models.TransactionType.INCOME, Decimal(0))
+    total_expenses = totals.get(models.TransactionType.EXPENSE, Decimal(0))
     net_savings = total_income - total_expenses
     savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
 
     return {
         "transactions": transactions,
         "summary": {
-            "total_income": total_income,
-            "total_expenses": total_expenses,
-            "net_savings": net_savings,
-            "savings_rate": savings_rate
+            "total_income": float(total_income),
+            "total_expenses": float(total_expenses),
+            "net_savings": float(net_savings),
+            "savings_rate": float(savings_rate)
         }
     }
 
-@router.get("/dashboard", response_model=schemas.DashboardData)
-def get_dashboard_data(db: Session = Depends(get_db)):
-    # Get the default user
-    user = db.query(models.User).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get monthly trends
-    monthly_trends = []
-    transactions = db.query(models.Transaction).filter(
-        models.Transaction.owner_id == user.id
-    ).all()
-
-    # Group transactions by month
-    month_data = {}
-    for t in transactions:
-        month_key = t.date.strftime("%Y-%m")
-        if month_key not in month_data:
-            month_data[month_key] = {"income": 0, "expenses": 0}
-        if t.type == models.TransactionType.INCOME:
-            month_data[month_key]["income"] += t.amount
-        else:
-            month_data[month_key]["expenses"] += t.amount
-
-    for month, data in sorted(month_data.items()):
-        monthly_trends.append({
-            "month": month,
-            "income": data["income"],
-            "expenses": data["expenses"]
-        })
-
-    # Get category breakdown
-    category_breakdown = []
-    categories = db.query(models.Category).filter(
-        models.Category.owner_id == user.id
-    ).all()
-
-    total_expenses = sum(t.amount for t in transactions if t.type == models.TransactionType.EXPENSE)
-    
-    for category in categories:
-        category_expenses = sum(t.amount for t in transactions 
-                              if t.category_id == category.id and t.type == models.TransactionType.EXPENSE)
-        if category_expenses > 0:
-            category_breakdown.append({
-                "category": category.name,
-                "amount": category_expenses,
-                "percentage": (category_expenses / total_expenses * 100) if total_expenses > 0 else 0
-            })
-
-    # Calculate financial summary
-    total_income = sum(t.amount for t in transactions if t.type == models.TransactionType.INCOME)
-    total_expenses = sum(t.amount for t in transactions if t.type == models.TransactionType.EXPENSE)
-    net_savings = total_income - total_expenses
-    savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
+@router.get("/trends", response_model=List[schemas.TrendPoint])
+def get_trends(
+    request: Request,
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    granularity: str = Query("month", pattern="^(day|week|month|quarter)$"),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """Income, expenses and net per period, with every period in the range present.
+
+    Defaults to the last year. Each point is labelled with the first day
+    of its period; weeks start on Monday.
+    """
+    end_date = end_date or datetime.now()
+    start_date = start_date or end_date - timedelta(days=365)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    if bucket_count(start_date, end_date, granularity) > report_service.MAX_TREND_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans more than {report_service.MAX_TREND_POINTS} periods; use a coarser granularity"
+        )
+    return cache.cached_response(
+        request, user.id, List[schemas.TrendPoint],
+        lambda: report_service.get_trends(db, user.id, start_date, end_date, granularity)
+    )
 
-    return {
-        "monthlyTrends": monthly_trends,
-        "categoryBreakdown": category_breakdown,
-        "financialSummary": {
-            "total_income": total_income,
-            "total_expenses": total_expenses,
-            "net_savings": net_savings,
-            "savings_rate": savings_rate
-        }
-    }
+@router.get("/dashboard", response_model=schemas.DashboardData)
+def get_dashboard_data(request: Request, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+    return cache.cached_response(
+        request, user.id, schemas.DashboardData, lambda: report_service.get_dashboard_data(db, user.id)
+    )
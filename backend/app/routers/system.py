@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from ..database import engine, async_engine
+from ..pool_metrics import pool_status
+
+router = APIRouter()
+
+@router.get("/pool")
+def get_pool_metrics():
+    """Connection pool usage: checked-out connections, overflow, checkout waits and timeouts"""
+    return {
+        "sync": pool_status("sync", engine.pool),
+        "async": pool_status("async", async_engine.pool),
+    }
@@ -1,49 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from typing import List
-from .. import models, schemas
+from typing import List, Optional
+from .. import cache, models, schemas, serialization
 from ..database import get_db
+from ..dependencies import get_current_user
+from ..services import balance_service, budget_service, import_service, rollup_service, search_service, transaction_service
+from ..utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
-def get_or_create_default_user(db: Session):
-    # Try to get the default user
-    user = db.query(models.User).first()
-    if not user:
-        # Create a default user if none exists
-        user = models.User(
-            email="default@example.com",
-            full_name="Default User"
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
-
 @router.post("/", response_model=schemas.TransactionResponse)
-def create_transaction(transaction: schemas.TransactionCreate, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def create_transaction(transaction: schemas.TransactionCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_transaction = models.Transaction(**transaction.dict(), owner_id=user.id)
     db.add(db_transaction)
+    rollup_service.apply_transaction(db, db_transaction)
+    budget_service.apply_transaction(db, db_transaction)
+    balance_service.apply_transaction(db, db_transaction)
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_transaction)
     return db_transaction
 
+@router.post("/import", response_model=schemas.TransactionImportResult)
+def import_transactions(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ofx)$", description="Defaults to the file extension"),
+    account_id: Optional[int] = Query(None, description="Account for rows that do not name one"),
+    category_id: Optional[int] = Query(None, description="Category for rows that do not name one"),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    file_format = file_format or import_service.detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Cannot tell the statement format; pass format=csv or format=ofx")
+    result = import_service.import_transactions(
+        db, file.file, file_format, user.id, account_id=account_id, category_id=category_id
+    )
+    cache.bump_version(user.id)
+    return result
+
+@router.post("/batch", response_model=List[schemas.TransactionResponse])
+def create_transactions_batch(
+    transactions: List[schemas.TransactionCreate] = Body(..., min_length=1, max_length=transaction_service.MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """Create up to MAX_BATCH_SIZE transactions at once, all or none.
+
+    Every item is checked before anything is written; if any is invalid
+    the response is a 422 listing each failing item by its index. The
+    created transactions are returned in request order.
+    """
+    errors = transaction_service.reference_errors(db, user.id, transactions)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    rows = transaction_service.create_batch(db, user.id, transactions)
+    db.commit()
+    cache.bump_version(user.id)
+    return serialization.json_response(List[schemas.TransactionResponse], rows)
+
+STREAM_CHUNK_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+
+def _stream_transactions(db: Session, query):
+    # Server-side cursor: rows are fetched in chunks so memory stays flat
+    result = db.execute(query.execution_options(stream_results=True, yield_per=STREAM_CHUNK_SIZE))
+    for transaction in result.scalars():
+        yield schemas.TransactionResponse.model_validate(transaction).model_dump_json() + "\n"
+
 @router.get("/", response_model=List[schemas.TransactionResponse])
-def get_transactions(db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
-    transactions = db.query(models.Transaction).filter(models.Transaction.owner_id == user.id).all()
-    return transactions
+def get_transactions(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """List transactions newest first, optionally paginated by an opaque (date, id) cursor.
+
+    Without limit or cursor the whole history is returned, as existing
+    clients expect. Pagination is opt-in: with either, pages hold limit
+    rows (DEFAULT_PAGE_SIZE by default) and the cursor for the next page is
+    returned in the X-Next-Cursor header. With stream=true the whole
+    history after the cursor is sent as NDJSON.
+    """
+    query = (
+        select(models.Transaction)
+        .filter(models.Transaction.owner_id == user.id)
+        .order_by(models.Transaction.date.desc(), models.Transaction.id.desc())
+    )
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(models.Transaction.date, models.Transaction.id) < tuple_(cursor_date, cursor_id)
+        )
+
+    if stream:
+        return StreamingResponse(_stream_transactions(db, query), media_type="application/x-ndjson")
+
+    if limit is None and cursor is None:
+        transactions = db.execute(query).scalars().all()
+        return serialization.json_response(List[schemas.TransactionResponse], transactions)
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    # Fetch one extra row to know whether another page exists
+    transactions = db.execute(query.limit(limit + 1)).scalars().all()
+    headers = {}
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+    return serialization.json_response(List[schemas.TransactionResponse], transactions, headers=headers)
+
+@router.get("/search", response_model=List[schemas.TransactionSearchResult])
+def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user)
+):
+    """Transactions whose description contains every word of q, best match first.
+
+    Words also match as prefixes ("coff" finds "Coffee"). When there are
+    more matches, the offset of the next page is in the X-Next-Offset header.
+    """
+    # Fetch one extra row to know whether another page exists
+    results = search_service.search(db, user.id, q, limit=limit + 1, offset=offset)
+    headers = {}
+    if len(results) > limit:
+        results = results[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+    return serialization.json_response(List[schemas.TransactionSearchResult], results, headers=headers)
 
 @router.get("/{transaction_id}", response_model=schemas.TransactionResponse)
-def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def get_transaction(transaction_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     transaction = db.query(models.Transaction).filter(
         models.Transaction.id == transaction_id,
         models.Transaction.owner_id == user.id
@@ -53,10 +146,7 @@ def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
     return transaction
 
 @router.put("/{transaction_id}", response_model=schemas.TransactionResponse)
-def update_transaction(transaction_id: int, transaction: schemas.TransactionCreate, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def update_transaction(transaction_id: int, transaction: schemas.TransactionCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_transaction = db.query(models.Transaction).filter(
         models.Transaction.id == transaction_id,
         models.Transaction.owner_id == user.id
@@ -64,19 +154,25 @@ def update_transaction(transaction_id: int, transaction: schemas.TransactionCrea
     if not db_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
+    # Move the transaction out of its old rollup, budgets and balance checkpoints and into the new ones
+    rollup_service.apply_transaction(db, db_transaction, sign=-1)
+    budget_service.apply_transaction(db, db_transaction, sign=-1)
+    balance_service.apply_transaction(db, db_transaction, sign=-1)
+
     # Update transaction fields
     for key, value in transaction.dict().items():
         setattr(db_transaction, key, value)
-    
+
+    rollup_service.apply_transaction(db, db_transaction)
+    budget_service.apply_transaction(db, db_transaction)
+    balance_service.apply_transaction(db, db_transaction)
     db.commit()
+    cache.bump_version(user.id)
     db.refresh(db_transaction)
     return db_transaction
 
 @router.delete("/{transaction_id}")
-def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    # Get or create the default user
-    user = get_or_create_default_user(db)
-    
+def delete_transaction(transaction_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     db_transaction = db.query(models.Transaction).filter(
         models.Transaction.id == transaction_id,
         models.Transaction.owner_id == user.id
@@ -84,6 +180,10 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
     if not db_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
+    rollup_service.apply_transaction(db, db_transaction, sign=-1)
+    budget_service.apply_transaction(db, db_transaction, sign=-1)
+    balance_service.apply_transaction(db, db_transaction, sign=-1)
     db.delete(db_transaction)
     db.commit()
+    cache.bump_version(user.id)
     return {"message": "Transaction deleted successfully"}
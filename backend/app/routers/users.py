@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
-from ..database import get_db
+from ..database import get_async_db
+from ..dependencies import get_current_user_async, invalidate_current_user
 from .. import models, schemas
 
 # Configure logging
@@ -13,28 +15,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/me", response_model=schemas.UserResponse)
-async def read_user_me(db: Session = Depends(get_db)):
+async def read_user_me(user: models.User = Depends(get_current_user_async)):
     """Get current user"""
     # For single user app, always return the first user or create one if none exists
-    user = db.query(models.User).first()
-    if not user:
-        user = models.User(
-            email="user@example.com",
-            full_name="Default User",
-            is_active=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     return user
 
 @router.put("/me", response_model=schemas.UserResponse)
 async def update_user_me(
     user_update: schemas.UserBase,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
 ):
     """Update current user"""
-    user = db.query(models.User).first()
+    user = await db.get(models.User, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -42,10 +35,11 @@ async def update_user_me(
         setattr(user, key, value)
     
     try:
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_current_user()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,17 +1,20 @@
-from pydantic import BaseModel, constr, confloat, condecimal, Field, EmailStr
+from pydantic import BaseModel, constr, confloat, condecimal, Field, EmailStr, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from .models import TransactionType, AccountType
+from .utils.time_buckets import to_utc
 
 __all__ = [
     'UserBase', 'UserCreate', 'UserResponse',
     'AccountBase', 'AccountCreate', 'AccountResponse',
+    'AccountBalance', 'NetWorthPoint',
     'CategoryBase', 'CategoryCreate', 'CategoryResponse',
     'TransactionBase', 'TransactionCreate', 'TransactionResponse',
+    'TransactionSearchResult', 'TransactionImportError', 'TransactionImportResult',
     'BudgetBase', 'BudgetCreate', 'BudgetResponse',
     'BudgetNotification', 'BudgetSummary',
-    'ReportParams', 'DashboardData', 'DetailedReport',
+    'ReportParams', 'TrendPoint', 'DashboardData', 'DetailedReport', 'FinancialReport',
     'MonthlyTrends', 'CategoryBreakdown', 'FinancialSummary',
     'DashboardResponse'
 ]
@@ -48,6 +51,15 @@ class AccountResponse(AccountBase):
     class Config:
         from_attributes = True
 
+class AccountBalance(BaseModel):
+    account_id: int
+    as_of: datetime
+    balance: Decimal
+
+class NetWorthPoint(BaseModel):
+    date: datetime
+    net_worth: Decimal
+
 class CategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -72,16 +84,37 @@ class TransactionBase(BaseModel):
     date: Optional[datetime] = None
 
 class TransactionCreate(TransactionBase):
-    pass
+    @field_validator("date")
+    @classmethod
+    def date_in_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Stored as UTC so the rollups and balance checkpoints bucket a
+        # transaction into the same month whichever offset it was sent with
+        return to_utc(value) if value is not None else None
 
 class TransactionResponse(TransactionBase):
     id: int
+    # Stored amounts already have two decimal places; the digit checks of
+    # the input constraint are the costliest part of serializing a row
+    amount: Decimal
     date: datetime
-    created_at: datetime
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class TransactionSearchResult(TransactionResponse):
+    # Relative relevance within one result list; not comparable across searches
+    rank: float
+
+class TransactionImportError(BaseModel):
+    line: int
+    error: str
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TransactionImportError]
+
 class BudgetBase(BaseModel):
     amount: condecimal(max_digits=10, decimal_places=2)
     category_id: int
@@ -96,7 +129,8 @@ class BudgetResponse(BudgetBase):
     id: int
     spent: float
     is_active: bool
-    created_at: datetime
+    threshold_crossed_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -108,6 +142,7 @@ class BudgetNotification(BaseModel):
     budget_amount: float
     percentage_used: float
     notification_threshold: float
+    threshold_crossed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -132,6 +167,13 @@ class ReportParams(BaseModel):
     category_ids: Optional[List[int]] = None
     transaction_type: Optional[TransactionType] = None
 
+class TrendPoint(BaseModel):
+    # First day of the day/week/month/quarter
+    period: date
+    income: Decimal
+    expenses: Decimal
+    net: Decimal
+
 class DashboardData(BaseModel):
     monthlyTrends: List[dict]
     categoryBreakdown: List[dict]
@@ -143,11 +185,17 @@ class DashboardData(BaseModel):
 class DetailedReport(BaseModel):
     transactions: List[TransactionResponse]
     summary: dict
-    trends: List[dict]
+    trends: List[dict] = []
 
     class Config:
         from_attributes = True
 
+class FinancialReport(BaseModel):
+    summary: dict
+    monthlyTrends: dict
+    categoryBreakdown: dict
+    accountBreakdown: dict
+
 class MonthlyTrends(BaseModel):
     month: int
     income: float
@@ -179,7 +227,7 @@ class DashboardResponse(BaseModel):
     recentTransactions: List[TransactionResponse]
     monthlySpending: List[dict]
     monthlyTrends: dict
-    categoryBreakdown: dict
+    categoryBreakdown: List[dict]
     summary: dict
 
     class Config:
@@ -0,0 +1,199 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, insert, select, update
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from ..models import Account, AccountBalanceSnapshot, Transaction, TransactionType
+from ..utils import upsert
+from ..utils.time_buckets import bucket, day_start
+from .rollup_service import month_of
+
+
+def signed_amount():
+    """Transaction.amount with income counting up and expenses down"""
+    return case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=-Transaction.amount)
+
+
+def _signed(transaction: Transaction) -> Decimal:
+    amount = Decimal(transaction.amount)
+    return amount if transaction.type == TransactionType.INCOME else -amount
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _apply_delta(db: Session, account_id: int, month: date, delta: Decimal) -> None:
+    # The change carries into every later checkpoint...
+    db.execute(
+        update(AccountBalanceSnapshot)
+        .where(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.month > month)
+        .values(closing_balance=AccountBalanceSnapshot.closing_balance + delta)
+        .execution_options(synchronize_session=False)
+    )
+    # ...and into this month's, created from the previous checkpoint by the
+    # first transaction of the month. One statement, so concurrent first
+    # writes of a month add up instead of racing to insert it
+    previous = (
+        select(AccountBalanceSnapshot.closing_balance)
+        .where(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.month < month)
+        .order_by(AccountBalanceSnapshot.month.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    statement = upsert.insert(db, AccountBalanceSnapshot).values(
+        account_id=account_id,
+        month=month,
+        closing_balance=func.coalesce(previous, 0) + delta
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.month],
+        set_={"closing_balance": AccountBalanceSnapshot.closing_balance + delta}
+    ))
+
+
+def apply_transaction(db: Session, transaction: Transaction, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) a transaction from its account's checkpoints.
+
+    Runs in the caller's DB transaction, like the rollup and budget updates.
+    """
+    if transaction.date is None:
+        db.flush()
+    if transaction.date is None or transaction.account_id is None or transaction.amount is None:
+        return
+    _apply_delta(db, transaction.account_id, month_of(transaction.date), _signed(transaction) * sign)
+
+
+def apply_totals(db: Session, totals: Dict[Tuple[int, date], Decimal]) -> None:
+    """Apply pre-aggregated signed deltas keyed by (account_id, month).
+
+    Keys are applied oldest month first so that a newly created checkpoint
+    always starts from an up-to-date previous one.
+    """
+    for (account_id, month), delta in sorted(totals.items()):
+        _apply_delta(db, account_id, month, delta)
+
+
+def rebuild_snapshots(db: Session, account_ids: Optional[List[int]] = None) -> int:
+    """Recompute checkpoints from the transactions table with a running sum"""
+    month = bucket(db, Transaction.date, "month")
+    monthly = (
+        select(
+            Transaction.account_id.label("account_id"),
+            month.label("month"),
+            func.sum(signed_amount()).label("net")
+        )
+        .where(Transaction.account_id.isnot(None), Transaction.date.isnot(None))
+        .group_by(Transaction.account_id, month)
+    )
+    clear = delete(AccountBalanceSnapshot)
+    if account_ids is not None:
+        monthly = monthly.where(Transaction.account_id.in_(account_ids))
+        clear = clear.where(AccountBalanceSnapshot.account_id.in_(account_ids))
+    monthly = monthly.subquery()
+    running = func.sum(monthly.c.net).over(partition_by=monthly.c.account_id, order_by=monthly.c.month)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(AccountBalanceSnapshot).from_select(
+            ["account_id", "month", "closing_balance"],
+            select(monthly.c.account_id, monthly.c.month, running)
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _closing_before(db: Session, account_ids: List[int], month: date) -> Dict[int, Decimal]:
+    # Latest checkpoint strictly before `month` for each account: one index
+    # seek per account on (account_id, month)
+    latest = (
+        select(
+            AccountBalanceSnapshot.account_id,
+            func.max(AccountBalanceSnapshot.month).label("month")
+        )
+        .where(AccountBalanceSnapshot.account_id.in_(account_ids), AccountBalanceSnapshot.month < month)
+        .group_by(AccountBalanceSnapshot.account_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.closing_balance)
+        .join(latest, (latest.c.account_id == AccountBalanceSnapshot.account_id)
+              & (latest.c.month == AccountBalanceSnapshot.month))
+    )
+    return dict(rows.all())
+
+
+def _flow_between(db: Session, account_ids: List[int], start: datetime, end: datetime) -> Dict[int, Decimal]:
+    rows = db.execute(
+        select(Transaction.account_id, func.sum(signed_amount()))
+        .where(
+            Transaction.account_id.in_(account_ids),
+            Transaction.date >= start,
+            Transaction.date <= end
+        )
+        .group_by(Transaction.account_id)
+    )
+    return dict(rows.all())
+
+
+def balances_as_of(db: Session, accounts: List[Account], as_of: datetime) -> Dict[int, Decimal]:
+    """Balance of each account at `as_of`.
+
+    Reads the last checkpoint before as_of's month and only the transactions
+    from the start of that month, instead of the account's whole history.
+    """
+    account_ids = [account.id for account in accounts]
+    if not account_ids:
+        return {}
+    month = month_of(as_of)
+    month_start = day_start(month, as_of)
+    closing = _closing_before(db, account_ids, month)
+    flow = _flow_between(db, account_ids, month_start, as_of)
+    return {
+        account.id: (account.balance or Decimal(0)) + closing.get(account.id, Decimal(0)) + flow.get(account.id, Decimal(0))
+        for account in accounts
+    }
+
+
+def net_worth_series(db: Session, accounts: List[Account], start: datetime, end: datetime) -> List[Tuple[datetime, Decimal]]:
+    """Net worth over all accounts at start, at each month boundary in between, and at end.
+
+    Month boundaries come straight from the checkpoints; only the partial
+    months at either end read transactions.
+    """
+    account_ids = [account.id for account in accounts]
+    opening = sum((account.balance or Decimal(0) for account in accounts), Decimal(0))
+    first_month = month_of(start)
+    last_month = month_of(end)
+
+    series = [(start, sum(balances_as_of(db, accounts, start).values(), Decimal(0)))]
+
+    # Carry each account's checkpoint forward through months without one
+    current = _closing_before(db, account_ids, first_month) if account_ids else {}
+    snapshots = db.execute(
+        select(AccountBalanceSnapshot.month, AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.closing_balance)
+        .where(
+            AccountBalanceSnapshot.account_id.in_(account_ids),
+            AccountBalanceSnapshot.month >= first_month,
+            AccountBalanceSnapshot.month < last_month
+        )
+        .order_by(AccountBalanceSnapshot.month)
+    ).all() if account_ids else []
+
+    index = 0
+    month = first_month
+    while month < last_month:
+        while index < len(snapshots) and snapshots[index].month == month:
+            current[snapshots[index].account_id] = snapshots[index].closing_balance
+            index += 1
+        month = _next_month(month)
+        # Balance at the boundary is everything up to the end of the previous month
+        boundary = day_start(month, end)
+        series.append((boundary, opening + sum(current.values(), Decimal(0))))
+
+    # An end on a month start (or equal to start) is already the last point
+    if series[-1][0] != end:
+        series.append((end, sum(balances_as_of(db, accounts, end).values(), Decimal(0))))
+    return series
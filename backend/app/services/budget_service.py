@@ -1,83 +1,133 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select, update
 from datetime import datetime
 from typing import List
 
-from ..models import Budget, Transaction, TransactionType
-from ..schemas import budget as budget_schema
+from ..models import Budget, Category, Transaction, TransactionType
+from ..utils.time_buckets import utc_now
 from fastapi import HTTPException, status
 
-async def check_budget_limits(db: Session, user_id: int):
-    """Check all active budgets for the user and return notifications for those exceeding threshold"""
-    notifications = []
-    active_budgets = (
-        db.query(Budget)
-        .filter(
-            Budget.owner_id == user_id,
-            Budget.is_active == True,
-            Budget.end_date >= datetime.now()
+def budget_spend_query(*filters):
+    """(budget id, spent) for every matching budget in one grouped query.
+
+    Budgets are joined to the expense transactions of their category that fall
+    inside the budget window, so spend for all budgets comes back at once.
+    """
+    spent = func.coalesce(func.sum(Transaction.amount), 0).label('spent')
+    transaction_match = and_(
+        Transaction.category_id == Budget.category_id,
+        Transaction.type == TransactionType.EXPENSE,
+        Transaction.date.between(Budget.start_date, Budget.end_date)
+    )
+    return (
+        select(Budget.id, spent)
+        .outerjoin(Transaction, transaction_match)
+        .where(*filters)
+        .group_by(Budget.id)
+    )
+
+def _crossed_at(spent, now: datetime):
+    """threshold_crossed_at for a budget whose spend becomes `spent`.
+
+    Keeps the first crossing time while the budget stays over its threshold
+    and clears it once spend drops back below.
+    """
+    return case(
+        (and_(Budget.amount > 0, spent >= Budget.amount * Budget.notification_threshold),
+         func.coalesce(Budget.threshold_crossed_at, now)),
+        else_=None
+    )
+
+
+def apply_transaction(db: Session, transaction: Transaction, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) a transaction from the spend of matching budgets.
+
+    Like rollup_service.apply_transaction this runs in the caller's DB
+    transaction, so budget spend commits or rolls back with the write.
+    """
+    if (transaction.type != TransactionType.EXPENSE or transaction.category_id is None
+            or transaction.date is None or transaction.amount is None):
+        return
+    spent = func.coalesce(Budget.spent, 0) + transaction.amount * sign
+    db.execute(
+        update(Budget)
+        .where(
+            Budget.category_id == transaction.category_id,
+            Budget.start_date <= transaction.date,
+            Budget.end_date >= transaction.date
         )
-        .all()
+        .values(spent=spent, threshold_crossed_at=_crossed_at(spent, utc_now()))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_spent(db: Session, *filters) -> None:
+    """Recompute spent from the transactions table for the budgets matching filters.
+
+    Used when a budget is created or its window/category changes, and to
+    repair drift; one UPDATE ... FROM budget_spend_query. The caller commits.
+    """
+    spend = budget_spend_query(*filters).subquery()
+    db.execute(
+        update(Budget)
+        .where(Budget.id == spend.c.id)
+        .values(spent=spend.c.spent,
+                threshold_crossed_at=_crossed_at(spend.c.spent, utc_now()))
+        .execution_options(synchronize_session=False)
     )
 
-    for budget in active_budgets:
-        # Calculate current spending for the budget period
-        current_spent = (
-            db.query(func.sum(Transaction.amount))
-            .filter(
-                Transaction.owner_id == user_id,
-                Transaction.category_id == budget.category_id,
-                Transaction.type == TransactionType.EXPENSE,
-                Transaction.date.between(budget.start_date, budget.end_date)
-            )
-            .scalar() or 0
+
+def notifications_query(now: datetime, *filters):
+    """(Budget, category name) for active budgets that have crossed their threshold"""
+    return (
+        select(Budget, Category.name)
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .where(
+            Budget.threshold_crossed_at.isnot(None),
+            Budget.start_date <= now,
+            Budget.end_date >= now,
+            *filters
         )
+        .order_by(Budget.id)
+    )
 
-        # Update budget spent amount
-        budget.spent = current_spent
-        
-        # Check if spending exceeds notification threshold
-        if current_spent >= (budget.amount * budget.notification_threshold):
-            notifications.append({
-                "budget_id": budget.id,
-                "category_name": budget.category.name,
-                "amount": budget.amount,
-                "spent": current_spent,
-                "percentage": (current_spent / budget.amount) * 100
-            })
-    
-    db.commit()
-    return notifications
+async def check_budget_limits(db: AsyncSession, user_id: int):
+    """Return notifications for the user's active budgets that exceed their threshold"""
+    rows = (await db.execute(notifications_query(
+        utc_now(), Budget.is_active == True, Budget.owner_id == user_id
+    ))).all()
+
+    return [
+        {
+            "budget_id": budget.id,
+            "category_name": category_name,
+            "amount": budget.amount,
+            "spent": budget.spent,
+            "percentage": (budget.spent / budget.amount) * 100
+        }
+        for budget, category_name in rows
+    ]
 
 def get_budget_summary(db: Session, user_id: int):
     """Get summary of all active budgets including spending progress"""
-    active_budgets = (
-        db.query(Budget)
-        .filter(
-            Budget.owner_id == user_id,
+    rows = db.execute(
+        select(Budget, Category.name)
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .where(
             Budget.is_active == True,
-            Budget.end_date >= datetime.now()
+            Budget.end_date >= utc_now(),
+            Budget.owner_id == user_id
         )
-        .all()
-    )
+        .order_by(Budget.id)
+    ).all()
 
     summary = []
-    for budget in active_budgets:
-        # Calculate current spending
-        current_spent = (
-            db.query(func.sum(Transaction.amount))
-            .filter(
-                Transaction.owner_id == user_id,
-                Transaction.category_id == budget.category_id,
-                Transaction.type == TransactionType.EXPENSE,
-                Transaction.date.between(budget.start_date, budget.end_date)
-            )
-            .scalar() or 0
-        )
-
+    for budget, category_name in rows:
+        current_spent = budget.spent or 0
         summary.append({
             "budget_id": budget.id,
-            "category_name": budget.category.name,
+            "category_name": category_name,
             "amount": budget.amount,
             "spent": current_spent,
             "remaining": budget.amount - current_spent,
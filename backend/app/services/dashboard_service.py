@@ -0,0 +1,140 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, null, select, union_all, String
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from ..models import Transaction, Category, Account, MonthlyRollup, TransactionType
+from ..utils.time_buckets import utc_now
+from .rollup_service import month_of
+
+
+def summary_query(owner_id: int, today: datetime):
+    """Every aggregate section of the owner's dashboard as one UNION ALL statement.
+
+    Rows are (section, label, month, type, amount):
+      trend    - per month and type, from the rollups (last 6 months)
+      category - expense total per category name (last 30 days)
+      balance  - sum of all account balances
+    """
+    trends = (
+        select(
+            literal('trend').label('section'),
+            null().cast(String).label('label'),
+            MonthlyRollup.month,
+            MonthlyRollup.type,
+            func.sum(MonthlyRollup.total).label('amount')
+        )
+        .filter(MonthlyRollup.owner_id == owner_id)
+        .filter(MonthlyRollup.month >= month_of(today - timedelta(days=180)))
+        .group_by(MonthlyRollup.month, MonthlyRollup.type)
+    )
+    categories = (
+        select(
+            literal('category'),
+            Category.name,
+            null(),
+            null(),
+            func.sum(Transaction.amount)
+        )
+        .join(Transaction, Transaction.category_id == Category.id)
+        .filter(Transaction.owner_id == owner_id)
+        .filter(Transaction.type == TransactionType.EXPENSE)
+        .filter(Transaction.date >= (today - timedelta(days=30)))
+        .group_by(Category.name)
+    )
+    balance = (
+        select(literal('balance'), null(), null(), null(), func.sum(Account.balance))
+        .filter(Account.owner_id == owner_id)
+    )
+    return union_all(trends, categories, balance)
+
+
+def recent_transactions_query(owner_id: int, limit: int = 5):
+    """The owner's most recent transactions, newest first"""
+    return (
+        select(Transaction)
+        .filter(Transaction.owner_id == owner_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit)
+    )
+
+
+def build_dashboard(rows, recent_transactions: List[Transaction], today: datetime) -> Dict[str, Any]:
+    """Shape summary_query rows into the DashboardResponse payload"""
+    current_month = month_of(today)
+    total_balance = 0.0
+    trends = []
+    categories = []
+    for section, label, month, type_, amount in rows:
+        if section == 'balance':
+            total_balance = float(amount or 0)
+        elif section == 'trend':
+            trends.append((month, type_, float(amount)))
+        else:
+            # Kept as Decimal so the expense total below is exact
+            categories.append((label, amount))
+
+    # Monthly spending and trends (income vs expenses); the current month's
+    # totals come out of the same rollup rows
+    trends.sort(key=lambda row: row[0])
+    trends_data = {}
+    monthly_spending = []
+    month_income = 0.0
+    month_expenses = 0.0
+    for month, type_, amount in trends:
+        month_str = month.strftime('%Y-%m')
+        if month_str not in trends_data:
+            trends_data[month_str] = {'income': 0, 'expense': 0}
+        if type_ == TransactionType.INCOME:
+            trends_data[month_str]['income'] = amount
+            if month == current_month:
+                month_income = amount
+        else:
+            trends_data[month_str]['expense'] = amount
+            monthly_spending.append({"month": month_str, "amount": amount})
+            if month == current_month:
+                month_expenses = amount
+
+    total_expenses = sum(amount for _, amount in categories)
+    breakdown_data = [
+        {
+            'category': name,
+            'amount': float(amount),
+            'percentage': float(amount / total_expenses * 100) if total_expenses > 0 else 0
+        }
+        for name, amount in categories
+    ]
+
+    return {
+        "totalBalance": total_balance,
+        "recentTransactions": recent_transactions,
+        "monthlySpending": monthly_spending,
+        "monthlyTrends": trends_data,
+        "categoryBreakdown": breakdown_data,
+        "summary": {
+            "monthIncome": month_income,
+            "monthExpenses": month_expenses,
+            "monthSavings": month_income - month_expenses,
+            "savingsRate": (month_income - month_expenses) / month_income * 100 if month_income > 0 else 0
+        }
+    }
+
+
+def get_dashboard(db: Session, owner_id: int) -> Dict[str, Any]:
+    """Compute the owner's dashboard in two round trips: the aggregates and the recent transactions.
+
+    Periods are measured in UTC, as the rollups' months are.
+    """
+    today = utc_now()
+    rows = db.execute(summary_query(owner_id, today)).all()
+    recent_transactions = db.execute(recent_transactions_query(owner_id)).scalars().all()
+    return build_dashboard(rows, recent_transactions, today)
+
+
+async def get_dashboard_async(db: AsyncSession, owner_id: int) -> Dict[str, Any]:
+    """Async variant of get_dashboard for the async session"""
+    today = utc_now()
+    rows = (await db.execute(summary_query(owner_id, today))).all()
+    recent_transactions = (await db.execute(recent_transactions_query(owner_id))).scalars().all()
+    return build_dashboard(rows, recent_transactions, today)
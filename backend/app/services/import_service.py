@@ -0,0 +1,245 @@
+import csv
+import io
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..money import to_cents
+from ..models import Transaction, TransactionType
+from ..utils.time_buckets import to_utc, utc_now
+from . import transaction_service
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+Row = Tuple[int, Dict[str, Any]]
+
+
+def _parse_date(value: str):
+    # fromisoformat is ~50x cheaper than dateutil, which only handles the
+    # non-ISO exports; unparseable dates are left for validation to report
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    # Imported here so the app does not load dateutil at startup for a fallback
+    from dateutil import parser as date_parser
+    try:
+        return date_parser.parse(value)
+    except (ValueError, OverflowError):
+        return value
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a statement row onto TransactionCreate fields.
+
+    Bank exports usually carry a signed amount and no type: negative amounts
+    become expenses and positive ones income.
+    """
+    row = {key.strip().lower(): (value.strip() if isinstance(value, str) else value)
+           for key, value in row.items() if key}
+    row = {key: value for key, value in row.items() if value not in ("", None)}
+    if isinstance(row.get("date"), str):
+        row["date"] = _parse_date(row["date"])
+    if "type" in row:
+        row["type"] = str(row["type"]).lower()
+    elif "amount" in row:
+        try:
+            amount = Decimal(str(row["amount"]))
+        except InvalidOperation:
+            return row
+        row["type"] = TransactionType.EXPENSE.value if amount < 0 else TransactionType.INCOME.value
+        row["amount"] = abs(amount)
+    return row
+
+
+def parse_csv(stream: BinaryIO) -> Iterator[Row]:
+    """Yield (line number, row) from a CSV statement with a header line"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        yield reader.line_num, _normalize(row)
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Z0-9.]+)>([^<\r\n]*)")
+
+
+_OFX_DATE = re.compile(r"(\d+)(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?")
+
+
+def _ofx_date(value: str) -> datetime:
+    """YYYYMMDD[HHMMSS[.XXX]][[offset[:TZ]]] in UTC.
+
+    The offset is in hours and may be fractional ([+5.5:IST]); without one
+    the time is GMT, as the OFX spec has it.
+    """
+    match = _OFX_DATE.match(value)
+    local = datetime.strptime(match.group(1)[:14].ljust(14, "0"), "%Y%m%d%H%M%S")
+    offset = timedelta(hours=float(match.group(2))) if match.group(2) else timedelta(0)
+    return to_utc(local.replace(tzinfo=timezone(offset)))
+
+
+def parse_ofx(stream: BinaryIO) -> Iterator[Row]:
+    """Yield (line number, row) for every STMTTRN in an OFX statement.
+
+    Handles both the SGML (OFX 1.x, unclosed leaf tags) and XML flavours.
+    """
+    current: Optional[Dict[str, str]] = None
+    start_line = 0
+    for line_no, line in enumerate(io.TextIOWrapper(stream, encoding="latin-1"), start=1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    yield start_line, _ofx_row(current)
+                    current = None
+                elif not closing:
+                    current, start_line = {}, line_no
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+
+def _ofx_row(fields: Dict[str, str]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    if "TRNAMT" in fields:
+        row["amount"] = fields["TRNAMT"].replace(",", ".")
+    if "DTPOSTED" in fields:
+        try:
+            row["date"] = _ofx_date(fields["DTPOSTED"])
+        except (AttributeError, ValueError):
+            row["date"] = fields["DTPOSTED"]
+    description = " - ".join(fields[tag] for tag in ("NAME", "MEMO") if tag in fields)
+    if description:
+        row["description"] = description
+    return _normalize(row)
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+}
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in ("ofx", "qfx"):
+            return "ofx"
+        if extension == "csv":
+            return "csv"
+    return None
+
+
+def _chunks(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+_COPY_COLUMNS = ("amount", "type", "description", "category_id", "account_id", "date", "owner_id")
+
+
+def _copy_transactions(db: Session, values: List[Dict[str, Any]]) -> None:
+    # COPY ... FROM STDIN through the session's own psycopg2 connection, so
+    # the rows are part of the same DB transaction as the rest of the import
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for value in values:
+        writer.writerow([
+            to_cents(value["amount"]), value["type"].name, value["description"], value["category_id"],
+            value["account_id"], value["date"].isoformat(), value["owner_id"]
+        ])
+    buffer.seek(0)
+    cursor = db.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY transactions ({', '.join(_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_transactions(db: Session, values: List[Dict[str, Any]]) -> None:
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_transactions(db, values)
+    else:
+        db.execute(insert(Transaction.__table__), values)
+
+
+def import_transactions(
+    db: Session,
+    stream: BinaryIO,
+    file_format: str,
+    owner_id: int,
+    account_id: Optional[int] = None,
+    category_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Validate and insert every row of a statement in one DB transaction.
+
+    account_id and category_id are used for rows that do not name their own.
+    Rows are validated against TransactionCreate in chunks and inserted with
+    COPY on Postgres (executemany elsewhere); invalid rows are skipped and reported by line. Rollups,
+    budget spend and balance checkpoints are updated once for the whole import.
+    """
+    accounts, categories = transaction_service.owned_references(db, owner_id)
+    defaults = {"account_id": account_id, "category_id": category_id}
+    # Undated rows get the time of the import, in UTC like the server default
+    now = utc_now()
+
+    imported = 0
+    errors: List[Dict[str, Any]] = []
+    error_count = 0
+    totals = transaction_service.BulkTotals(owner_id)
+
+    for chunk in _chunks(PARSERS[file_format](stream), CHUNK_SIZE):
+        values = []
+        for line, row in chunk:
+            for key, default in defaults.items():
+                if default is not None:
+                    row.setdefault(key, default)
+            try:
+                transaction = schemas.TransactionCreate.model_validate(row)
+                if transaction.account_id not in accounts:
+                    raise ValueError(f"account_id: unknown account {transaction.account_id}")
+                if transaction.category_id is not None and transaction.category_id not in categories:
+                    raise ValueError(f"category_id: unknown category {transaction.category_id}")
+            except (ValidationError, ValueError) as exc:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    message = _error_message(exc) if isinstance(exc, ValidationError) else str(exc)
+                    errors.append({"line": line, "error": message})
+                continue
+
+            values.append({
+                **transaction.model_dump(),
+                "date": transaction.date or now,
+                "owner_id": owner_id
+            })
+
+        if values:
+            _insert_transactions(db, values)
+            imported += len(values)
+            for value in values:
+                totals.add(value)
+
+    totals.apply(db)
+    db.commit()
+
+    return {"imported": imported, "failed": error_count, "errors": errors}
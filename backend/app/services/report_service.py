@@ -1,60 +1,159 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from calendar import monthrange
+from sqlalchemy import func, select, tuple_
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Dict, Any, Tuple
 
-from ..models import Transaction, Category, TransactionType
-from ..schemas import transaction as transaction_schema
+from ..models import Account, Transaction, Category, MonthlyRollup, TransactionType
+from ..utils.time_buckets import bucket, bucket_range, day_start, next_bucket
+from . import export_service
+from .rollup_service import month_of
+from .. import schemas
+
+# Upper bound on the points of one trend series (about five years of days)
+MAX_TREND_POINTS = 2000
+
+Totals = Dict[date, Dict[TransactionType, Decimal]]
+
+# Cents precision, like the amounts summed from the Money columns
+ZERO = Decimal("0.00")
+
+def _add_totals(totals: Totals, rows) -> None:
+    for period, type_, total in rows:
+        by_type = totals.setdefault(period, {})
+        by_type[type_] = by_type.get(type_, Decimal(0)) + total
+
+def _rollup_totals(db: Session, user_id: int, granularity: str, first_month: date, end_month: date):
+    """Per-bucket totals of the whole months [first_month, end_month), from the rollups"""
+    period = bucket(db, MonthlyRollup.month, granularity)
+    return (
+        db.query(period, MonthlyRollup.type, func.sum(MonthlyRollup.total))
+        .filter(
+            MonthlyRollup.owner_id == user_id,
+            MonthlyRollup.month >= first_month,
+            MonthlyRollup.month < end_month
+        )
+        .group_by(period, MonthlyRollup.type)
+        .all()
+    )
+
+def _transaction_totals(db: Session, user_id: int, granularity: str, *conditions):
+    """Per-bucket totals straight from the transactions matching conditions"""
+    period = bucket(db, Transaction.date, granularity)
+    return (
+        db.query(period, Transaction.type, func.sum(Transaction.amount))
+        .filter(Transaction.owner_id == user_id, *conditions)
+        .group_by(period, Transaction.type)
+        .all()
+    )
+
+def _whole_months(start_date: datetime, end_date: datetime) -> Tuple[date, date]:
+    """[first, end) of the calendar months lying entirely inside [start_date, end_date]"""
+    first = month_of(start_date)
+    if start_date != day_start(first, start_date):
+        first = next_bucket(first, "month")
+    return first, month_of(end_date)
+
+def get_trends(db: Session, user_id: int, start_date: datetime, end_date: datetime,
+               granularity: str = "month") -> List[Dict[str, Any]]:
+    """Income, expenses and net per day/week/month/quarter between start_date and end_date.
+
+    Every bucket in the range is present, with zeros where nothing was
+    recorded, oldest first. Month and quarter series read the rollups for
+    the whole months in the range and transactions only for the partial
+    months at either end; day and week series group the transactions.
+    """
+    totals: Totals = {}
+    edges = [(Transaction.date >= start_date, Transaction.date <= end_date)]
+    if granularity in ("month", "quarter"):
+        first_month, end_month = _whole_months(start_date, end_date)
+        if first_month < end_month:
+            _add_totals(totals, _rollup_totals(db, user_id, granularity, first_month, end_month))
+            first_start = day_start(first_month, start_date)
+            edges = [(Transaction.date >= start_date, Transaction.date < first_start)] if start_date < first_start else []
+            edges.append((
+                Transaction.date >= day_start(end_month, end_date),
+                Transaction.date <= end_date
+            ))
+    for conditions in edges:
+        _add_totals(totals, _transaction_totals(db, user_id, granularity, *conditions))
+
+    series = []
+    for period in bucket_range(start_date, end_date, granularity):
+        by_type = totals.get(period, {})
+        income = by_type.get(TransactionType.INCOME, ZERO)
+        expenses = by_type.get(TransactionType.EXPENSE, ZERO)
+        series.append({"period": period, "income": income, "expenses": expenses, "net": income - expenses})
+    return series
 
 def get_monthly_trends(db: Session, user_id: int, months: int = 6) -> Dict[str, Any]:
     """Get monthly income and expense trends"""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30 * months)
+    series = get_trends(db, user_id, start_date, end_date, "month")
+    return {
+        "labels": [point["period"].strftime('%b %Y') for point in series],
+        "income": [float(point["income"]) for point in series],
+        "expenses": [float(point["expenses"]) for point in series]
+    }
 
-    # Get monthly aggregates
-    monthly_data = (
-        db.query(
-            extract('year', Transaction.date).label('year'),
-            extract('month', Transaction.date).label('month'),
-            Transaction.type,
-            func.sum(Transaction.amount).label('total')
-        )
+def get_dashboard_data(db: Session, user_id: int) -> Dict[str, Any]:
+    """All-time monthly trends, category breakdown and totals for the reports dashboard.
+
+    Everything comes from GROUP BY over the monthly rollups, so the cost
+    depends on months x categories rather than on the number of transactions.
+    """
+    monthly = (
+        db.query(MonthlyRollup.month, MonthlyRollup.type, func.sum(MonthlyRollup.total))
+        .filter(MonthlyRollup.owner_id == user_id)
+        .group_by(MonthlyRollup.month, MonthlyRollup.type)
+        .order_by(MonthlyRollup.month)
+        .all()
+    )
+    category_totals = (
+        db.query(Category.name, func.sum(MonthlyRollup.total))
+        .join(MonthlyRollup, MonthlyRollup.category_id == Category.id)
         .filter(
-            Transaction.owner_id == user_id,
-            Transaction.date.between(start_date, end_date)
-        )
-        .group_by(
-            extract('year', Transaction.date),
-            extract('month', Transaction.date),
-            Transaction.type
+            Category.owner_id == user_id,
+            MonthlyRollup.owner_id == user_id,
+            MonthlyRollup.type == TransactionType.EXPENSE
         )
-        .order_by('year', 'month')
+        .group_by(Category.id, Category.name)
+        .order_by(Category.id)
         .all()
     )
 
-    # Process data into the required format
-    months_labels = []
-    income_data = []
-    expense_data = []
-
-    for year, month, type_, total in monthly_data:
-        month_label = datetime(int(year), int(month), 1).strftime('%b %Y')
-        if month_label not in months_labels:
-            months_labels.append(month_label)
-            income_data.append(0)
-            expense_data.append(0)
-        
-        idx = months_labels.index(month_label)
+    # Sums come back as exact Decimals; they only become floats in the payload
+    month_data = {}
+    total_income = Decimal(0)
+    total_expenses = Decimal(0)
+    for month, type_, total in monthly:
+        data = month_data.setdefault(month.strftime("%Y-%m"), {"income": 0, "expenses": 0})
         if type_ == TransactionType.INCOME:
-            income_data[idx] = float(total)
+            data["income"] = float(total)
+            total_income += total
         else:
-            expense_data[idx] = float(total)
+            data["expenses"] = float(total)
+            total_expenses += total
 
+    net_savings = total_income - total_expenses
     return {
-        "labels": months_labels,
-        "income": income_data,
-        "expenses": expense_data
+        "monthlyTrends": [{"month": month, **data} for month, data in month_data.items()],
+        "categoryBreakdown": [
+            {
+                "category": name,
+                "amount": float(amount),
+                "percentage": float(amount / total_expenses * 100) if total_expenses > 0 else 0
+            }
+            for name, amount in category_totals
+            if amount > 0
+        ],
+        "financialSummary": {
+            "total_income": float(total_income),
+            "total_expenses": float(total_expenses),
+            "net_savings": float(net_savings),
+            "savings_rate": float(net_savings / total_income * 100) if total_income > 0 else 0
+        }
     }
 
 def get_category_breakdown(db: Session, user_id: int, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
@@ -115,35 +214,140 @@ def get_financial_summary(db: Session, user_id: int, start_date: datetime, end_d
         "savingsRate": savings_rate
     }
 
+# The GROUPING SETS of the detailed report, by their grouping(month,
+# category_id, account_id) bitmask: a bit is set for each column the set
+# leaves out. Every set is also split by type
+REPORT_LEVELS = {0b111: "summary", 0b011: "month", 0b101: "category", 0b110: "account"}
+
+def _report_rows_grouping_sets(db: Session, month, filters):
+    # One scan of the matching transactions feeds all four groupings
+    rows = db.execute(
+        select(
+            month.label("month"),
+            Transaction.type,
+            Transaction.category_id,
+            Transaction.account_id,
+            func.sum(Transaction.amount).label("total"),
+            func.count().label("count"),
+            func.grouping(month, Transaction.category_id, Transaction.account_id).label("level")
+        )
+        .where(*filters)
+        .group_by(func.grouping_sets(
+            tuple_(Transaction.type),
+            tuple_(month, Transaction.type),
+            tuple_(Transaction.category_id, Transaction.type),
+            tuple_(Transaction.account_id, Transaction.type)
+        ))
+    )
+    for row in rows:
+        level = REPORT_LEVELS[row.level]
+        key = {"summary": None, "month": row.month, "category": row.category_id, "account": row.account_id}[level]
+        yield level, key, row.type, row.total, row.count
+
+def _report_rows_rollup(db: Session, month, filters):
+    # No GROUPING SETS (SQLite): group once at the finest grain, which has
+    # at most months x types x categories x accounts rows, and add those up
+    totals: Dict[Tuple[str, Any, TransactionType], List[Any]] = {}
+    rows = db.execute(
+        select(month, Transaction.type, Transaction.category_id, Transaction.account_id,
+               func.sum(Transaction.amount), func.count())
+        .where(*filters)
+        .group_by(month, Transaction.type, Transaction.category_id, Transaction.account_id)
+    )
+    for month_, type_, category_id, account_id, total, count in rows:
+        for level, key in (("summary", None), ("month", month_), ("category", category_id), ("account", account_id)):
+            entry = totals.setdefault((level, key, type_), [Decimal(0), 0])
+            entry[0] += total
+            entry[1] += count
+    for (level, key, type_), (total, count) in totals.items():
+        yield level, key, type_, total, count
+
+def report_aggregates(db: Session, params: schemas.ReportParams, owner_id: int) -> Dict[str, Dict[Any, Dict[TransactionType, Tuple[Decimal, int]]]]:
+    """(total, count) per type overall, per month, per category and per account.
+
+    Keyed by level ("summary", "month", "category", "account"), then by
+    month / category_id / account_id (None for the summary), then by type,
+    for the transactions matching the report params. One GROUPING SETS
+    statement on Postgres, one finest-grain GROUP BY elsewhere.
+    """
+    month = bucket(db, Transaction.date, "month")
+    filters = export_service.report_filters(params, owner_id)
+    if db.get_bind().dialect.name == "postgresql":
+        rows = _report_rows_grouping_sets(db, month, filters)
+    else:
+        rows = _report_rows_rollup(db, month, filters)
+    aggregates = {level: {} for level in REPORT_LEVELS.values()}
+    for level, key, type_, total, count in rows:
+        aggregates[level].setdefault(key, {})[type_] = (total, count)
+    return aggregates
+
+def _names(db: Session, model, ids) -> Dict[int, str]:
+    ids = [id_ for id_ in ids if id_ is not None]
+    return dict(db.query(model.id, model.name).filter(model.id.in_(ids)).all()) if ids else {}
+
+def _total(by_type: Dict[TransactionType, Tuple[Decimal, int]], type_: TransactionType) -> Decimal:
+    return by_type.get(type_, (ZERO, 0))[0]
+
 def generate_detailed_report(db: Session, user_id: int, start_date: datetime, end_date: datetime,
                            account_ids: List[int] = None, category_ids: List[int] = None,
                            transaction_type: str = None) -> Dict[str, Any]:
-    """Generate a detailed financial report with various metrics and breakdowns"""
-    
-    # Base query for transactions
-    query = db.query(Transaction).filter(
-        Transaction.owner_id == user_id,
-        Transaction.date.between(start_date, end_date)
+    """Summary, monthly trends, expenses per category and flows per account for a date range.
+
+    Every section covers exactly the requested range and filters, and all
+    of them come from one aggregate query (report_aggregates). Months with
+    no transactions are included with zeros. The transactions themselves
+    are served by POST /api/reports/ and its exports.
+    """
+    params = schemas.ReportParams(
+        start_date=start_date, end_date=end_date, account_ids=account_ids,
+        category_ids=category_ids, transaction_type=transaction_type
     )
+    aggregates = report_aggregates(db, params, user_id)
 
-    # Apply filters if provided
-    if account_ids:
-        query = query.filter(Transaction.account_id.in_(account_ids))
-    if category_ids:
-        query = query.filter(Transaction.category_id.in_(category_ids))
-    if transaction_type:
-        query = query.filter(Transaction.type == transaction_type)
+    overall = aggregates["summary"].get(None, {})
+    total_income = _total(overall, TransactionType.INCOME)
+    total_expenses = _total(overall, TransactionType.EXPENSE)
+    net_savings = total_income - total_expenses
 
-    transactions = query.all()
+    months = bucket_range(start_date, end_date, "month")
+    by_month = aggregates["month"]
+
+    # Expense categories, largest first; uncategorized spending only counts in the totals
+    category_totals = sorted(
+        (
+            (category_id, by_type[TransactionType.EXPENSE][0])
+            for category_id, by_type in aggregates["category"].items()
+            if category_id is not None and TransactionType.EXPENSE in by_type
+        ),
+        key=lambda item: item[1], reverse=True
+    )
+    category_names = _names(db, Category, [category_id for category_id, _ in category_totals])
 
-    # Get various summaries
-    monthly_trends = get_monthly_trends(db, user_id)
-    category_breakdown = get_category_breakdown(db, user_id, start_date, end_date)
-    financial_summary = get_financial_summary(db, user_id, start_date, end_date)
+    account_ids_found = sorted(account_id for account_id in aggregates["account"] if account_id is not None)
+    account_names = _names(db, Account, account_ids_found)
 
     return {
-        "summary": financial_summary,
-        "monthlyTrends": monthly_trends,
-        "categoryBreakdown": category_breakdown,
-        "transactions": [transaction_schema.Transaction.from_orm(t) for t in transactions]
+        "summary": {
+            "totalIncome": float(total_income),
+            "totalExpenses": float(total_expenses),
+            "netSavings": float(net_savings),
+            "savingsRate": float(net_savings / total_income * 100) if total_income > 0 else 0,
+            "transactionCount": sum(count for _, count in overall.values())
+        },
+        "monthlyTrends": {
+            "labels": [month.strftime('%b %Y') for month in months],
+            "income": [float(_total(by_month.get(month, {}), TransactionType.INCOME)) for month in months],
+            "expenses": [float(_total(by_month.get(month, {}), TransactionType.EXPENSE)) for month in months]
+        },
+        "categoryBreakdown": {
+            "labels": [category_names.get(category_id, "") for category_id, _ in category_totals],
+            "data": [float(total) for _, total in category_totals]
+        },
+        "accountBreakdown": {
+            "labels": [account_names.get(account_id, "") for account_id in account_ids_found],
+            "income": [float(_total(aggregates["account"][account_id], TransactionType.INCOME))
+                       for account_id in account_ids_found],
+            "expenses": [float(_total(aggregates["account"][account_id], TransactionType.EXPENSE))
+                         for account_id in account_ids_found]
+        }
     }
@@ -0,0 +1,144 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, delete, insert, null, select, update
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from ..models import ROLLUP_BUCKET, MonthlyRollup, Transaction, TransactionType
+from ..utils import upsert
+from ..utils.time_buckets import bucket, bucket_start
+
+
+def month_of(value: datetime) -> date:
+    """First day of the month a transaction date falls in"""
+    return bucket_start(value, "month")
+
+
+RollupKey = Tuple[int, date, TransactionType, Optional[int]]
+
+
+def rollup_key(transaction: Transaction) -> RollupKey:
+    """(owner_id, month, type, category_id) bucket a transaction is counted in"""
+    return (transaction.owner_id, month_of(transaction.date), transaction.type, transaction.category_id)
+
+
+def _apply_delta(db: Session, key: RollupKey, total: Decimal, count: int) -> None:
+    owner_id, month, type_, category_id = key
+    if count <= 0:
+        # Removals only ever touch a bucket that already exists
+        db.execute(
+            update(MonthlyRollup)
+            .where(
+                MonthlyRollup.owner_id == owner_id,
+                MonthlyRollup.month == month,
+                MonthlyRollup.type == type_,
+                MonthlyRollup.category_id.is_(None) if category_id is None
+                else MonthlyRollup.category_id == category_id
+            )
+            .values(total=MonthlyRollup.total + total, count=MonthlyRollup.count + count)
+            .execution_options(synchronize_session=False)
+        )
+        return
+    # One atomic statement: concurrent first writes to a bucket add up
+    # instead of racing to insert it
+    statement = upsert.insert(db, MonthlyRollup).values(
+        owner_id=owner_id,
+        month=month,
+        type=type_,
+        category_id=category_id,
+        total=total,
+        count=count
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=ROLLUP_BUCKET,
+        set_={
+            "total": MonthlyRollup.total + statement.excluded.total,
+            "count": MonthlyRollup.count + statement.excluded.count,
+        }
+    ))
+
+
+def apply_transaction(db: Session, transaction: Transaction, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) a transaction from its monthly rollup.
+
+    Runs in the caller's DB transaction so the rollup commits or rolls back
+    together with the transaction write.
+    """
+    if transaction.date is None:
+        # Let the server default fill in the date before bucketing
+        db.flush()
+        if transaction.date is None:
+            return
+    _apply_delta(db, rollup_key(transaction), transaction.amount * sign, sign)
+
+
+def apply_totals(db: Session, totals: Dict[RollupKey, Tuple[Decimal, int]]) -> None:
+    """Add pre-aggregated (total, count) deltas, one statement per touched bucket.
+
+    Bulk writers sum their rows per rollup_key first so a large import costs
+    one upsert per month/type/category instead of one per row.
+    """
+    for key, (total, count) in totals.items():
+        _apply_delta(db, key, total, count)
+
+
+def fold_category(db: Session, category_id: int) -> None:
+    """Move a category's rollups into the uncategorized buckets before it is deleted.
+
+    Its transactions become uncategorized (ON DELETE SET NULL); letting the
+    rollups follow the same way would give owners a second uncategorized
+    row for the same month and type. Does not commit.
+    """
+    statement = upsert.insert(db, MonthlyRollup).from_select(
+        ["owner_id", "month", "type", "category_id", "total", "count"],
+        select(
+            MonthlyRollup.owner_id,
+            MonthlyRollup.month,
+            MonthlyRollup.type,
+            null(),
+            MonthlyRollup.total,
+            MonthlyRollup.count
+        ).where(MonthlyRollup.category_id == category_id)
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=ROLLUP_BUCKET,
+        set_={
+            "total": MonthlyRollup.total + statement.excluded.total,
+            "count": MonthlyRollup.count + statement.excluded.count,
+        }
+    ))
+    db.execute(delete(MonthlyRollup).where(MonthlyRollup.category_id == category_id))
+
+
+def rebuild_rollups(db: Session, owner_id: Optional[int] = None) -> int:
+    """Recompute rollups from scratch, for one owner or for everyone"""
+    month = bucket(db, Transaction.date, "month")
+    source = (
+        select(
+            Transaction.owner_id,
+            month,
+            Transaction.type,
+            Transaction.category_id,
+            func.sum(Transaction.amount),
+            func.count()
+        )
+        .filter(
+            Transaction.owner_id.isnot(None),
+            Transaction.date.isnot(None),
+            Transaction.type.isnot(None)
+        )
+        .group_by(Transaction.owner_id, month, Transaction.type, Transaction.category_id)
+    )
+    clear = delete(MonthlyRollup)
+    if owner_id is not None:
+        source = source.filter(Transaction.owner_id == owner_id)
+        clear = clear.where(MonthlyRollup.owner_id == owner_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(MonthlyRollup).from_select(
+            ["owner_id", "month", "type", "category_id", "total", "count"], source
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,207 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from .. import cache
+from ..models import TRANSACTION_SEARCH_VECTOR, Transaction
+from .export_service import EXPORT_COLUMNS
+
+MAX_QUERY_TERMS = 8
+
+# Owners whose in-process index is kept; the least recently searched is
+# dropped first
+MAX_INDEXED_OWNERS = 32
+
+# Letters and digits; underscores and punctuation separate words, as they
+# do for Postgres' text search parser
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return _WORD.findall(value.lower()) if value else []
+
+
+class InvertedIndex:
+    """Term -> {transaction id: occurrences} over one owner's descriptions.
+
+    update() brings it in line with the owner's rows, re-tokenizing only the
+    transactions added, changed or deleted since the last update. Callers
+    hold lock around update() and search().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.documents: Dict[int, Tuple[Optional[datetime], Optional[str]]] = {}
+        # Newest first among equal ranks; undated rows sort last
+        self.recency: Dict[int, float] = {}
+        # Sorted, so the terms sharing a prefix are one contiguous run;
+        # rebuilt on the next search after terms come or go
+        self._terms: Optional[List[str]] = None
+
+    def add(self, transaction_id: int, date: Optional[datetime], description: Optional[str]) -> None:
+        self.documents[transaction_id] = (date, description)
+        self.recency[transaction_id] = -date.timestamp() if date else float("inf")
+        for term in tokenize(description):
+            documents = self.postings.get(term)
+            if documents is None:
+                documents = self.postings[term] = {}
+                self._terms = None
+            documents[transaction_id] = documents.get(transaction_id, 0) + 1
+
+    def remove(self, transaction_id: int) -> None:
+        _, description = self.documents.pop(transaction_id)
+        del self.recency[transaction_id]
+        for term in set(tokenize(description)):
+            documents = self.postings[term]
+            del documents[transaction_id]
+            if not documents:
+                del self.postings[term]
+                self._terms = None
+
+    def update(self, rows: Iterable[Tuple[int, Optional[datetime], Optional[str]]]) -> None:
+        """Apply the difference between the indexed transactions and rows, all of the owner's"""
+        seen = set()
+        for transaction_id, date, description in rows:
+            seen.add(transaction_id)
+            indexed = self.documents.get(transaction_id)
+            if indexed == (date, description):
+                continue
+            if indexed is not None:
+                self.remove(transaction_id)
+            self.add(transaction_id, date, description)
+        for transaction_id in self.documents.keys() - seen:
+            self.remove(transaction_id)
+
+    def _expand(self, prefix: str) -> Iterator[str]:
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        position = bisect_left(self._terms, prefix)
+        while position < len(self._terms) and self._terms[position].startswith(prefix):
+            yield self._terms[position]
+            position += 1
+
+    def search(self, terms: List[str], limit: int, offset: int) -> List[Tuple[float, int]]:
+        """(rank, id) of the transactions matching every term, best first.
+
+        Each term also matches words it is a prefix of, at half the weight
+        of an exact match; ties go to the newest transaction.
+        """
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores: Dict[int, float] = defaultdict(float)
+            for word in self._expand(term):
+                weight = 1.0 if word == term else 0.5
+                for transaction_id, occurrences in self.postings[word].items():
+                    term_scores[transaction_id] += weight * occurrences
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {transaction_id: score + term_scores[transaction_id]
+                          for transaction_id, score in scores.items() if transaction_id in term_scores}
+            if not scores:
+                return []
+        best = heapq.nsmallest(
+            offset + limit, scores.items(),
+            key=lambda item: (-item[1], self.recency[item[0]], -item[0])
+        )
+        return [(score, transaction_id) for transaction_id, score in best[offset:]]
+
+
+class SearchIndexes:
+    """In-process inverted indexes for databases without full-text search (SQLite).
+
+    One index per owner, built on first search and brought up to date when
+    the owner's cache version has moved, i.e. after any committed write.
+    At most max_owners indexes are kept, least recently searched dropped
+    first. Like the memory cache, each worker process holds its own copy.
+    """
+
+    def __init__(self, max_owners: int = MAX_INDEXED_OWNERS):
+        self.max_owners = max_owners
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[int, Tuple[str, InvertedIndex]]" = OrderedDict()
+
+    def get(self, db: Session, owner_id: int) -> InvertedIndex:
+        # Read the version before the rows: a write committed meanwhile
+        # leaves the index tagged as stale rather than missing the write
+        version = cache.backend.version(owner_id)
+        with self._lock:
+            entry = self._indexes.get(owner_id)
+            if entry is not None:
+                self._indexes.move_to_end(owner_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        index = entry[1] if entry is not None else InvertedIndex()
+        rows = db.execute(
+            select(Transaction.id, Transaction.date, Transaction.description)
+            .where(Transaction.owner_id == owner_id)
+        ).all()
+        with index.lock:
+            index.update(rows)
+        with self._lock:
+            self._indexes[owner_id] = (version, index)
+            self._indexes.move_to_end(owner_id)
+            while len(self._indexes) > self.max_owners:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+indexes = SearchIndexes()
+
+
+def _search_postgres(db: Session, owner_id: int, terms: List[str], limit: int, offset: int) -> List[Dict[str, Any]]:
+    # Every term as a prefix; tokenize() leaves nothing tsquery would parse as an operator
+    query = func.to_tsquery(text("'simple'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+    rank = func.ts_rank(TRANSACTION_SEARCH_VECTOR, query)
+    rows = db.execute(
+        select(*EXPORT_COLUMNS, rank.label("rank"))
+        .where(Transaction.owner_id == owner_id, TRANSACTION_SEARCH_VECTOR.op("@@")(query))
+        .order_by(rank.desc(), Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit)
+        .offset(offset)
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+def _search_index(db: Session, owner_id: int, terms: List[str], limit: int, offset: int) -> List[Dict[str, Any]]:
+    index = indexes.get(db, owner_id)
+    with index.lock:
+        ranked = index.search(terms, limit, offset)
+    if not ranked:
+        return []
+    rows = {
+        row["id"]: dict(row) for row in db.execute(
+            select(*EXPORT_COLUMNS).where(Transaction.id.in_([transaction_id for _, transaction_id in ranked]))
+        ).mappings()
+    }
+    # Rows deleted since the index was built are simply left out
+    return [dict(rows[transaction_id], rank=rank) for rank, transaction_id in ranked if transaction_id in rows]
+
+
+def search(db: Session, owner_id: int, q: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    """The owner's transactions whose description contains every word of q
+    (as a word or word prefix), as TransactionSearchResult rows.
+
+    Best match first, newest first among equal ranks. Postgres answers
+    from the GIN index on the description's tsvector, other databases from
+    the in-process inverted index.
+    """
+    terms = tokenize(q)[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, owner_id, terms, limit, offset)
+    return _search_index(db, owner_id, terms, limit, offset)
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..money import from_cents, to_cents
+from ..models import Account, Budget, Category, Transaction, TransactionType
+from ..utils.time_buckets import utc_now
+from . import balance_service, budget_service, rollup_service
+from .export_service import EXPORT_COLUMNS
+
+MAX_BATCH_SIZE = 1000
+
+
+class BulkTotals:
+    """Rollup, balance checkpoint and budget changes of many new transactions.
+
+    Collected row by row and applied once, in the caller's DB transaction,
+    instead of per transaction as the single-row write paths do.
+    """
+
+    def __init__(self, owner_id: int):
+        self.owner_id = owner_id
+        # Per-bucket [cents, count]; integer sums stay exact over large imports
+        self.rollups: Dict[rollup_service.RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+        # Signed cents per (account_id, month) for the balance checkpoints
+        self.balances: Dict[Tuple[int, Any], int] = defaultdict(int)
+        self.categories: Set[int] = set()
+
+    def add(self, value: Dict[str, Any]) -> None:
+        month = rollup_service.month_of(value["date"])
+        key = (self.owner_id, month, value["type"], value["category_id"])
+        cents = to_cents(value["amount"])
+        self.rollups[key][0] += cents
+        self.rollups[key][1] += 1
+        self.balances[(value["account_id"], month)] += cents if value["type"] == TransactionType.INCOME else -cents
+        if value["type"] == TransactionType.EXPENSE and value["category_id"] is not None:
+            self.categories.add(value["category_id"])
+
+    def apply(self, db: Session) -> None:
+        rollup_service.apply_totals(db, {key: (from_cents(cents), count) for key, (cents, count) in self.rollups.items()})
+        balance_service.apply_totals(db, {key: from_cents(cents) for key, cents in self.balances.items()})
+        if self.categories:
+            budget_service.refresh_spent(db, Budget.category_id.in_(self.categories))
+
+
+def owned_references(db: Session, owner_id: int) -> Tuple[Set[int], Set[int]]:
+    """Ids of the accounts and categories the owner's transactions may point at"""
+    accounts = set(db.execute(select(Account.id).where(Account.owner_id == owner_id)).scalars())
+    categories = set(db.execute(
+        select(Category.id).where(or_(Category.owner_id == owner_id, Category.owner_id.is_(None)))
+    ).scalars())
+    return accounts, categories
+
+
+def reference_errors(db: Session, owner_id: int, transactions: List[schemas.TransactionCreate]) -> List[Dict[str, Any]]:
+    """Items naming an account or category the owner cannot use, as request validation errors"""
+    accounts, categories = owned_references(db, owner_id)
+    errors = []
+    for index, transaction in enumerate(transactions):
+        if transaction.account_id not in accounts:
+            errors.append({"type": "value_error", "loc": ["body", index, "account_id"],
+                           "msg": f"Unknown account {transaction.account_id}"})
+        if transaction.category_id is not None and transaction.category_id not in categories:
+            errors.append({"type": "value_error", "loc": ["body", index, "category_id"],
+                           "msg": f"Unknown category {transaction.category_id}"})
+    return errors
+
+
+def create_batch(db: Session, owner_id: int, transactions: List[schemas.TransactionCreate]) -> List[RowMapping]:
+    """Insert the transactions in one statement and update the derived tables once.
+
+    RETURNING hands back the ids and stored values in input order, so no
+    row has to be read back. Does not commit.
+    """
+    # UTC, as the column's server default stamps single-row creates
+    now = utc_now()
+    values = [
+        {**transaction.model_dump(), "date": transaction.date or now, "owner_id": owner_id}
+        for transaction in transactions
+    ]
+    rows = db.execute(
+        insert(Transaction.__table__).returning(*EXPORT_COLUMNS, sort_by_parameter_order=True),
+        values
+    ).mappings().all()
+
+    totals = BulkTotals(owner_id)
+    for value in values:
+        totals.add(value)
+    totals.apply(db)
+    return rows
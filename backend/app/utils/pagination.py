@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    """Encode a (date, id) keyset position into an opaque cursor string"""
+    payload = json.dumps({"d": date.isoformat(), "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor back into its (date, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["d"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,103 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Union
+
+from sqlalchemy import Date, Integer, String, cast, func
+
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+# Weeks start on Monday, as Postgres' date_trunc('week') has them
+_SQLITE_MODIFIERS = {
+    "day": (),
+    "week": ("weekday 0", "-6 days"),
+    "month": ("start of month",),
+}
+
+
+def utc_now() -> datetime:
+    """The current time in UTC, aware; the one clock to compare with stored dates"""
+    return datetime.now(timezone.utc)
+
+
+def to_utc(value: datetime) -> datetime:
+    """value in UTC, the database session's timezone.
+
+    Buckets are calendar days in UTC, as date_trunc computes them in the
+    session. Naive datetimes are taken to be UTC already, as the session
+    takes them.
+    """
+    return value.astimezone(timezone.utc) if value.tzinfo is not None else value
+
+
+def day_start(day: date, like: datetime) -> datetime:
+    """Midnight UTC at the start of day; aware if like is, naive like the stored dates otherwise"""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc if like.tzinfo is not None else None)
+
+
+def bucket_start(value: Union[date, datetime], granularity: str) -> date:
+    """First day of the day/week/month/quarter bucket value falls in, in UTC"""
+    day = to_utc(value).date() if isinstance(value, datetime) else value
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return date(day.year, day.month - (day.month - 1) % 3, 1)
+    raise ValueError(f"Unknown granularity {granularity!r}")
+
+
+def next_bucket(start: date, granularity: str) -> date:
+    """First day of the bucket after the one starting at start"""
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    months = 3 if granularity == "quarter" else 1
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_range(start: Union[date, datetime], end: Union[date, datetime], granularity: str) -> List[date]:
+    """Start of every bucket from the one holding start to the one holding end.
+
+    The full set of keys for a series, so buckets without data can be
+    filled in rather than left out.
+    """
+    current = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def bucket_count(start: Union[date, datetime], end: Union[date, datetime], granularity: str) -> int:
+    """len(bucket_range(start, end, granularity)) without building the list"""
+    first = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    if last < first:
+        return 0
+    if granularity in ("day", "week"):
+        return (last - first).days // (1 if granularity == "day" else 7) + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // (3 if granularity == "quarter" else 1) + 1
+
+
+def bucket(db, column, granularity: str):
+    """SQL expression for the first day of the bucket column falls in, as a Date.
+
+    date_trunc on Postgres, date() modifiers on SQLite. Group by it, but
+    filter on the raw column: a range on the column can use the
+    (owner_id, date) index, a condition on the expression cannot.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}")
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc(granularity, column), Date)
+    if granularity == "quarter":
+        # Back to the start of the month, then 0-2 months to the quarter's first
+        months_in = (cast(func.strftime("%m", column), Integer) - 1) % 3
+        return func.date(column, "start of month", "-" + cast(months_in, String) + " months", type_=Date)
+    return func.date(column, *_SQLITE_MODIFIERS[granularity], type_=Date)
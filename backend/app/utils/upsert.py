@@ -0,0 +1,15 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def insert(db: Session, model):
+    """INSERT for the session's dialect, with on_conflict_do_update / do_nothing.
+
+    Both supported databases spell upserts as INSERT ... ON CONFLICT.
+    """
+    return _INSERTS[db.get_bind().dialect.name](model)
@@ -0,0 +1,81 @@
+"""Benchmark for balance-at-date and the net-worth series.
+
+Compares replaying every transaction up to each month boundary with
+balance_service.net_worth_series, which reads the monthly balance
+checkpoints and only the transactions of the partial months at either end.
+
+    python benchmarks/bench_balances.py --transactions 1000000 --days 1825
+"""
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import common
+
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models import Account, Transaction
+from app.services import balance_service
+
+
+def replay_series(db, accounts, start, end):
+    """Net worth at the same points, each one summed over the full history"""
+    opening = sum((account.balance for account in accounts), Decimal(0))
+    account_ids = [account.id for account in accounts]
+    points = [start]
+    month = balance_service._next_month(start.date().replace(day=1))
+    while datetime.combine(month, datetime.min.time()) < end:
+        points.append(datetime.combine(month, datetime.min.time()))
+        month = balance_service._next_month(month)
+    points.append(end)
+
+    series = []
+    for point in points:
+        # Month boundaries cover everything strictly before the new month
+        include = Transaction.date < point if point not in (start, end) else Transaction.date <= point
+        flow = db.execute(
+            select(func.sum(balance_service.signed_amount()))
+            .where(Transaction.account_id.in_(account_ids), include)
+        ).scalar()
+        series.append((point, opening + (flow or Decimal(0))))
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=1825, help="History length; one checkpoint per month")
+    parser.add_argument("--repeat", type=int, default=10)
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user_id = common.seed(args.transactions, days=args.days)
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+
+    def run(series):
+        db = SessionLocal()
+        try:
+            accounts = db.query(Account).filter(Account.owner_id == user_id).all()
+            return series(db, accounts, start, end)
+        finally:
+            db.close()
+
+    assert run(replay_series) == run(balance_service.net_worth_series), \
+        "checkpoint series differs from the full replay"
+
+    results = {
+        "replay per point": common.summarize(common.timed(lambda: run(replay_series), repeat=args.repeat)),
+        "monthly checkpoints": common.summarize(
+            common.timed(lambda: run(balance_service.net_worth_series), repeat=args.repeat)
+        ),
+    }
+    common.print_comparison(
+        f"GET /api/accounts/net-worth over {args.days} days, {args.transactions} transactions", results
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark for creating many transactions at once.
+
+Compares N calls of POST /api/transactions/ (one INSERT, one commit and
+the rollup, budget and balance upkeep per transaction) with one call of
+POST /api/transactions/batch, which inserts the N rows in a single
+INSERT ... RETURNING and updates the derived tables once per bucket.
+
+    python benchmarks/bench_batch_writes.py --batch-size 500
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+import common
+
+from sqlalchemy import select
+
+from app import models, schemas
+from app.database import SessionLocal
+from app.routers import transactions
+
+
+def make_batch(db, user_id, size, rng):
+    accounts = db.execute(select(models.Account.id).where(models.Account.owner_id == user_id)).scalars().all()
+    categories = db.execute(select(models.Category.id).where(models.Category.owner_id == user_id)).scalars().all()
+    now = datetime.now()
+    return [
+        schemas.TransactionCreate(
+            amount=f"{rng.uniform(1, 500):.2f}",
+            type=rng.choice(list(models.TransactionType)),
+            description=f"Batch transaction {index}",
+            category_id=rng.choice(categories),
+            account_id=rng.choice(accounts),
+            date=now - timedelta(days=rng.randrange(365))
+        )
+        for index in range(size)
+    ]
+
+
+def one_by_one(batch, user):
+    db = SessionLocal()
+    try:
+        for transaction in batch:
+            transactions.create_transaction(transaction, db=db, user=user)
+    finally:
+        db.close()
+
+
+def batched(batch, user):
+    db = SessionLocal()
+    try:
+        transactions.create_transactions_batch(batch, db=db, user=user)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=20000, help="Existing history to seed")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user = models.User(id=common.seed(args.transactions))
+    db = SessionLocal()
+    try:
+        batch = make_batch(db, user.id, args.batch_size, random.Random(7))
+    finally:
+        db.close()
+
+    results = {
+        "one request per row": common.summarize(common.timed(lambda: one_by_one(batch, user), repeat=args.repeat)),
+        "batch endpoint": common.summarize(common.timed(lambda: batched(batch, user), repeat=args.repeat)),
+    }
+    common.print_comparison(f"Creating {args.batch_size} transactions", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark for budget spend computation.
+
+Compares the previous per-budget approach (one SUM query per budget plus a
+lazy load of its category) with budget_service.budget_spend_query, the
+single grouped query refresh_spent recomputes every budget's spend with,
+and with reading the spent column that transaction writes keep current.
+
+    python benchmarks/bench_budgets.py --budgets 1000 --transactions 200000
+"""
+import argparse
+
+import common
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models import Budget, Category, Transaction, TransactionType
+from app.services import budget_service
+
+
+def legacy_spend(db, user_id):
+    result = []
+    for budget in db.query(Budget).filter(Budget.owner_id == user_id).all():
+        spent = (
+            db.query(func.sum(Transaction.amount))
+            .filter(
+                Transaction.owner_id == user_id,
+                Transaction.category_id == budget.category_id,
+                Transaction.type == TransactionType.EXPENSE,
+                Transaction.date.between(budget.start_date, budget.end_date)
+            )
+            .scalar() or 0
+        )
+        result.append((budget.id, budget.category.name, spent))
+    return result
+
+
+def grouped_spend(db, user_id):
+    spend = budget_service.budget_spend_query(Budget.owner_id == user_id).subquery()
+    rows = db.execute(
+        select(spend.c.id, Category.name, spend.c.spent)
+        .join(Budget, Budget.id == spend.c.id)
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .order_by(spend.c.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def maintained_spend(db, user_id):
+    rows = db.execute(
+        select(Budget.id, Category.name, Budget.spent)
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .where(Budget.owner_id == user_id)
+        .order_by(Budget.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=200000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user_id = common.seed(args.transactions, categories=args.categories)
+    common.seed_budgets(user_id, args.budgets)
+
+    results = {}
+    for name, compute in (("legacy (N+1)", legacy_spend), ("grouped query", grouped_spend),
+                          ("maintained column", maintained_spend)):
+        def run():
+            db = SessionLocal()
+            try:
+                return compute(db, user_id)
+            finally:
+                db.close()
+        results[name] = common.summarize(common.timed(run, repeat=args.repeat))
+
+    # Both approaches must agree before their timings mean anything
+    db = SessionLocal()
+    try:
+        legacy = {budget_id: round(spent, 2) for budget_id, _, spent in legacy_spend(db, user_id)}
+        for compute in (grouped_spend, maintained_spend):
+            other = {budget_id: round(spent, 2) for budget_id, _, spent in compute(db, user_id)}
+            assert legacy == other, f"{compute.__name__} differs from per-budget spend"
+    finally:
+        db.close()
+
+    common.print_comparison(
+        f"Budget spend, {args.budgets} budgets, {args.transactions} transactions", results
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Latency benchmark for GET /api/dashboard.
+
+Compares the previous handler (six sequential queries on one blocking
+session inside ``async def``) with dashboard_service.get_dashboard, which
+needs two round trips and is served from the threadpool. Besides per-call
+latency it measures how long the event loop is stalled while a burst of
+concurrent dashboard requests is being served.
+
+    python benchmarks/bench_dashboard.py --transactions 200000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import common
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Transaction, Category, Account, MonthlyRollup, TransactionType
+from app.services import dashboard_service
+from app.services.rollup_service import month_of
+
+
+async def legacy_dashboard():
+    """The previous GET /api/dashboard body: one session, queries back to back"""
+    db = SessionLocal()
+    try:
+        total_balance = db.query(func.sum(Account.balance)).scalar() or 0.0
+        recent_transactions = db.query(Transaction).order_by(Transaction.date.desc()).limit(5).all()
+        today = datetime.now()
+        monthly_trends = (
+            db.query(MonthlyRollup.month, MonthlyRollup.type, func.sum(MonthlyRollup.total))
+            .filter(MonthlyRollup.month >= month_of(today - timedelta(days=180)))
+            .group_by(MonthlyRollup.month, MonthlyRollup.type)
+            .order_by(MonthlyRollup.month)
+            .all()
+        )
+        category_breakdown = (
+            db.query(Category.name, func.sum(Transaction.amount))
+            .join(Transaction, Transaction.category_id == Category.id)
+            .filter(Transaction.type == TransactionType.EXPENSE)
+            .filter(Transaction.date >= (today - timedelta(days=30)))
+            .group_by(Category.name)
+            .all()
+        )
+        month_totals = dict(
+            db.query(MonthlyRollup.type, func.sum(MonthlyRollup.total))
+            .filter(MonthlyRollup.month == month_of(today))
+            .group_by(MonthlyRollup.type)
+            .all()
+        )
+        return total_balance, recent_transactions, monthly_trends, category_breakdown, month_totals
+    finally:
+        db.close()
+
+
+def _get_dashboard(user_id: int):
+    db = SessionLocal()
+    try:
+        return dashboard_service.get_dashboard(db, user_id)
+    finally:
+        db.close()
+
+
+async def new_dashboard(user_id: int):
+    # FastAPI runs the plain-def handler in its threadpool
+    return await run_in_threadpool(_get_dashboard, user_id)
+
+
+async def burst(handler, concurrency: int):
+    """Serve `concurrency` simultaneous requests; return (wall ms, worst loop stall ms)"""
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        interval = 0.001
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append((time.perf_counter() - start - interval) * 1000)
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    wall = (time.perf_counter() - start) * 1000
+    done.set()
+    await monitor
+    return wall, max(stalls) if stalls else 0.0
+
+
+async def warm_burst(handler, concurrency: int):
+    # The first burst spawns worker threads and pool connections; measure the second
+    await burst(handler, concurrency)
+    return await burst(handler, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user_id = common.seed(args.transactions)
+
+    results = {}
+    for name, handler in (("legacy (sequential)", legacy_dashboard),
+                          ("engine (2 round trips)", lambda: new_dashboard(user_id))):
+        latency = common.summarize(common.timed(lambda: asyncio.run(handler()), repeat=args.repeat))
+        wall, stall = asyncio.run(warm_burst(handler, args.concurrency))
+        latency.update({"burst_wall_ms": round(wall, 1), "max_loop_stall_ms": round(stall, 1)})
+        results[name] = latency
+
+    common.print_comparison(f"GET /api/dashboard, {args.transactions} transactions", results)
+
+
+if __name__ == "__main__":
+    main()
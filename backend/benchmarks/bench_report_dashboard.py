@@ -0,0 +1,113 @@
+"""Benchmark for GET /api/reports/dashboard.
+
+Compares the previous handler, which loads every transaction as an ORM
+object and rescans the list once per category, with
+report_service.get_dashboard_data, which aggregates the monthly rollups
+with GROUP BY.
+
+    python benchmarks/bench_report_dashboard.py --transactions 1000000 --categories 200
+"""
+import argparse
+from decimal import Decimal
+
+import common
+
+from app.database import SessionLocal
+from app.models import Category, Transaction, TransactionType
+from app.services import report_service
+
+
+def legacy_dashboard(db, user_id):
+    """The previous GET /api/reports/dashboard body"""
+    transactions = db.query(Transaction).filter(Transaction.owner_id == user_id).all()
+
+    month_data = {}
+    for t in transactions:
+        month_key = t.date.strftime("%Y-%m")
+        if month_key not in month_data:
+            month_data[month_key] = {"income": 0, "expenses": 0}
+        if t.type == TransactionType.INCOME:
+            month_data[month_key]["income"] += t.amount
+        else:
+            month_data[month_key]["expenses"] += t.amount
+    monthly_trends = [
+        {"month": month, "income": data["income"], "expenses": data["expenses"]}
+        for month, data in sorted(month_data.items())
+    ]
+
+    category_breakdown = []
+    categories = db.query(Category).filter(Category.owner_id == user_id).all()
+    total_expenses = sum(t.amount for t in transactions if t.type == TransactionType.EXPENSE)
+    for category in categories:
+        category_expenses = sum(t.amount for t in transactions
+                                if t.category_id == category.id and t.type == TransactionType.EXPENSE)
+        if category_expenses > 0:
+            category_breakdown.append({
+                "category": category.name,
+                "amount": category_expenses,
+                "percentage": (category_expenses / total_expenses * 100) if total_expenses > 0 else 0
+            })
+
+    total_income = sum(t.amount for t in transactions if t.type == TransactionType.INCOME)
+    net_savings = total_income - total_expenses
+    return {
+        "monthlyTrends": monthly_trends,
+        "categoryBreakdown": category_breakdown,
+        "financialSummary": {
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "net_savings": net_savings,
+            "savings_rate": (net_savings / total_income * 100) if total_income > 0 else 0
+        }
+    }
+
+
+def rounded(value):
+    if isinstance(value, (float, Decimal)):
+        return round(float(value), 2)
+    if isinstance(value, dict):
+        return {key: rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item) for item in value]
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--legacy-repeat", type=int, default=1,
+                        help="The legacy handler takes minutes at 1M rows")
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user_id = common.seed(args.transactions, categories=args.categories)
+
+    def run(handler):
+        db = SessionLocal()
+        try:
+            return handler(db, user_id)
+        finally:
+            db.close()
+
+    # Both handlers must return the same payload before their timings mean anything
+    assert rounded(run(legacy_dashboard)) == rounded(run(report_service.get_dashboard_data)), \
+        "rollup dashboard differs from the legacy handler"
+
+    results = {
+        "legacy (O(c x n) loop)": common.summarize(
+            common.timed(lambda: run(legacy_dashboard), repeat=args.legacy_repeat)
+        ),
+        "rollup GROUP BY": common.summarize(
+            common.timed(lambda: run(report_service.get_dashboard_data), repeat=args.repeat)
+        ),
+    }
+    common.print_comparison(
+        f"GET /api/reports/dashboard, {args.transactions} transactions x {args.categories} categories", results
+    )
+
+
+if __name__ == "__main__":
+    main()
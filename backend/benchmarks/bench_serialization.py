@@ -0,0 +1,93 @@
+"""Serialization benchmark for large list responses.
+
+Times POST /api/reports/ over 50k transactions, from the query to the
+response body bytes, as it was served before and as it is now:
+
+- "response_model + JSON": ORM rows validated by FastAPI against the
+  previous TransactionResponse, dumped to dicts and encoded with the json
+  module (the old default JSONResponse)
+- "response_model + ORJSON": the same, encoded by ORJSONResponse, the
+  app's default response class now
+- "fast path": reports.generate_report as it is now, plain column rows
+  validated and dumped to bytes by a cached TypeAdapter
+
+    python benchmarks/bench_serialization.py --transactions 50000
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import common
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas
+from app.database import SessionLocal
+from app.routers import reports
+from app.services import export_service
+
+
+class LegacyTransactionResponse(schemas.TransactionBase):
+    """TransactionResponse before the fast path, with the input constraints on amount"""
+    id: int
+    date: datetime
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+def response_model_path(params, user, response_class):
+    """The previous handler body plus what FastAPI did with its return value"""
+    field = create_response_field(name="report", type_=List[LegacyTransactionResponse], mode="serialization")
+    db = SessionLocal()
+    try:
+        rows = db.query(models.Transaction).filter(*export_service.report_filters(params, user.id)).all()
+        content = asyncio.run(serialize_response(field=field, response_content=rows))
+        return response_class(content).body
+    finally:
+        db.close()
+
+
+def fast_path(params, user):
+    db = SessionLocal()
+    try:
+        return reports.generate_report(params, db=db, user=user).body
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=10)
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    common.reset_database(args.reset)
+    user = models.User(id=common.seed(args.transactions))
+    now = datetime.now()
+    params = schemas.ReportParams(start_date=now - timedelta(days=366), end_date=now)
+
+    paths = {
+        "response_model + JSON": lambda: response_model_path(params, user, JSONResponse),
+        "response_model + ORJSON": lambda: response_model_path(params, user, ORJSONResponse),
+        "fast path": lambda: fast_path(params, user),
+    }
+    bodies = {name: run() for name, run in paths.items()}
+    expected = sorted(json.loads(bodies["response_model + JSON"]), key=lambda row: row["id"])
+    for name, body in bodies.items():
+        assert sorted(json.loads(body), key=lambda row: row["id"]) == expected, f"{name} serializes differently"
+
+    results = {name: common.summarize(common.timed(run, repeat=args.repeat)) for name, run in paths.items()}
+    common.print_comparison(
+        f"POST /api/reports/ with {len(expected)} transactions ({len(bodies['fast path']) // 1024} KB)", results
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against BENCHMARK_DATABASE_URL when it is set, otherwise
+against a throwaway SQLite file; the app's own DATABASE_URL is never
+used. Importing this module points the app at that database, so it must
+happen before any ``app`` import. Every benchmark drops and recreates the
+tables, which it refuses to do on anything but the throwaway file unless
+run with --reset.
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import mean, median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DATABASE_URL = "sqlite:///./benchmark.db"
+DATABASE_URL = os.environ.get("BENCHMARK_DATABASE_URL", DEFAULT_DATABASE_URL)
+os.environ["DATABASE_URL"] = DATABASE_URL
+
+from sqlalchemy import func, insert, select, text
+
+from app.database import Base, engine, SessionLocal
+from app import models
+from app.services.balance_service import rebuild_snapshots
+from app.services.budget_service import refresh_spent
+from app.services.rollup_service import rebuild_rollups
+
+BATCH_SIZE = 10000
+
+
+def add_reset_argument(parser) -> None:
+    parser.add_argument("--reset", action="store_true",
+                        help="Allow dropping and recreating the tables of a BENCHMARK_DATABASE_URL "
+                             "other than the default SQLite file")
+
+
+def reset_database(confirmed: bool = False):
+    """Drop and recreate every table; only the default file unless confirmed"""
+    if DATABASE_URL != DEFAULT_DATABASE_URL and not confirmed:
+        sys.exit(f"Refusing to drop the tables of {engine.url!r}; pass --reset to wipe it for the benchmark")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def analyze() -> None:
+    """Refresh planner statistics so freshly seeded tables are not planned as empty"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def seed(transactions: int, categories: int = 20, accounts: int = 3, days: int = 365, seed: int = 42) -> int:
+    """Create one user with the given amount of data and return its id"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(models.User).values(email="bench@example.com", full_name="Benchmark User")
+        ).inserted_primary_key[0]
+        conn.execute(insert(models.Account), [
+            {"name": f"Account {i}", "type": models.AccountType.BANK, "balance": 1000.0,
+             "currency": "USD", "owner_id": user_id}
+            for i in range(accounts)
+        ])
+        conn.execute(insert(models.Category), [
+            {"name": f"Category {i}",
+             "type": models.TransactionType.INCOME if i == 0 else models.TransactionType.EXPENSE,
+             "owner_id": user_id}
+            for i in range(categories)
+        ])
+        account_ids = [row.id for row in conn.execute(models.Account.__table__.select())]
+        category_ids = [row.id for row in conn.execute(models.Category.__table__.select())]
+
+        for start in range(0, transactions, BATCH_SIZE):
+            conn.execute(insert(models.Transaction), [
+                {
+                    "amount": round(rng.uniform(1, 500), 2),
+                    "type": models.TransactionType.INCOME if rng.random() < 0.2 else models.TransactionType.EXPENSE,
+                    "description": f"Transaction {start + i}",
+                    "date": now - timedelta(seconds=rng.randrange(days * 86400)),
+                    "category_id": rng.choice(category_ids),
+                    "account_id": rng.choice(account_ids),
+                    "owner_id": user_id,
+                }
+                for i in range(min(BATCH_SIZE, transactions - start))
+            ])
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        rebuild_snapshots(db)
+    finally:
+        db.close()
+    analyze()
+    return user_id
+
+
+def seed_budgets(user_id: int, count: int, seed: int = 42) -> None:
+    """Create `count` budgets spread over the user's expense categories and the last year.
+
+    Amounts are sized around the average monthly spend of a category, so
+    some budgets cross their threshold, and every fourth budget covers
+    today so there are active ones to notify about. spent and
+    threshold_crossed_at are computed as budget creation does.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    with engine.begin() as conn:
+        category_ids = [
+            row.id for row in conn.execute(
+                models.Category.__table__.select().where(
+                    models.Category.owner_id == user_id,
+                    models.Category.type == models.TransactionType.EXPENSE
+                )
+            )
+        ]
+        total_expenses = conn.execute(
+            select(func.coalesce(func.sum(models.Transaction.amount), 0)).where(
+                models.Transaction.owner_id == user_id,
+                models.Transaction.type == models.TransactionType.EXPENSE
+            )
+        ).scalar()
+        monthly_spend = float(total_expenses) / max(len(category_ids), 1) / 12
+        budgets = []
+        for i in range(count):
+            start = now - timedelta(days=rng.randrange(30 if i % 4 == 0 else 365))
+            budgets.append({
+                "amount": round(max(10.0, monthly_spend * rng.uniform(0.5, 2.0)), 2),
+                "spent": 0.0,
+                "start_date": start,
+                "end_date": start + timedelta(days=30),
+                "category_id": rng.choice(category_ids),
+                "owner_id": user_id,
+                "notification_threshold": 0.8,
+                "is_active": True,
+            })
+        conn.execute(insert(models.Budget), budgets)
+
+    db = SessionLocal()
+    try:
+        refresh_spent(db, models.Budget.owner_id == user_id)
+        db.commit()
+    finally:
+        db.close()
+    analyze()
+
+
+def timed(fn, repeat: int = 20):
+    """Run fn repeatedly and return per-call timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(mean(ordered), 3),
+        "median_ms": round(median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "min_ms": round(ordered[0], 3),
+    }
+
+
+def print_comparison(title, results):
+    print(f"\n=== {title} ===")
+    for name, stats in results.items():
+        print(f"{name:<24} " + "  ".join(f"{key}={value}" for key, value in stats.items()))
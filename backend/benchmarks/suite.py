@@ -0,0 +1,191 @@
+"""Service-level benchmark suite for the hot read endpoints.
+
+Calls the router functions and the report/budget/dashboard services
+directly (no HTTP, no response cache) against a freshly seeded database at
+each data size, serializes the result through the endpoint's response
+model as FastAPI would, and records the timings to JSON. With a baseline
+the run is compared case by case and exits non-zero when a case's median
+regressed by more than --threshold.
+
+    python benchmarks/suite.py --sizes 1000,10000,100000 --save-baseline
+    python benchmarks/suite.py --sizes 1000,10000,100000 --baseline benchmarks/baseline.json
+
+Baselines are only comparable on the same machine and database; record
+one before a change and compare after it.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import common
+
+from fastapi import Response
+from app import models, schemas, serialization
+from app.database import SessionLocal, engine
+from app.routers import accounts, budgets, reports, transactions
+from app.services import budget_service, dashboard_service, report_service
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "results.json")
+
+
+class Context(NamedTuple):
+    user: models.User
+    today: datetime
+
+
+class Case(NamedTuple):
+    name: str
+    response_model: Any
+    run: Callable[[Any, Context], Any]
+    # The seeded data must give the case something to return, or it times an empty result
+    expect_rows: bool = False
+
+
+def _last_days(ctx: Context, days: int) -> schemas.ReportParams:
+    return schemas.ReportParams(start_date=ctx.today - timedelta(days=days), end_date=ctx.today)
+
+
+CASES: List[Case] = [
+    Case("transactions.get_transactions", List[schemas.TransactionResponse],
+         lambda db, ctx: transactions.get_transactions(limit=100, cursor=None, stream=False,
+                                                        db=db, user=ctx.user)),
+    Case("reports.generate_report[30d]", List[schemas.TransactionResponse],
+         lambda db, ctx: reports.generate_report(_last_days(ctx, 30), db=db, user=ctx.user)),
+    Case("reports.summary[90d]", schemas.DetailedReport,
+         lambda db, ctx: reports._build_summary(db, ctx.user.id, ctx.today - timedelta(days=90), ctx.today)),
+    Case("report_service.get_dashboard_data", schemas.DashboardData,
+         lambda db, ctx: report_service.get_dashboard_data(db, ctx.user.id)),
+    Case("report_service.generate_detailed_report[90d]", schemas.FinancialReport,
+         lambda db, ctx: report_service.generate_detailed_report(
+             db, ctx.user.id, ctx.today - timedelta(days=90), ctx.today)),
+    Case("dashboard_service.get_dashboard", schemas.DashboardResponse,
+         lambda db, ctx: dashboard_service.get_dashboard(db, ctx.user.id)),
+    Case("budgets.get_budget_notifications", List[schemas.BudgetNotification],
+         lambda db, ctx: budgets.get_budget_notifications(db=db), expect_rows=True),
+    Case("budgets.summary", List[schemas.BudgetSummary],
+         lambda db, ctx: budgets._budget_summaries(db)),
+    Case("budget_service.get_budget_summary", Any,
+         lambda db, ctx: budget_service.get_budget_summary(db, ctx.user.id)),
+    Case("accounts.get_net_worth[1y]", List[schemas.NetWorthPoint],
+         lambda db, ctx: accounts.get_net_worth(start_date=None, end_date=None, db=db, user=ctx.user)),
+]
+
+
+def _call(case: Case, ctx: Context) -> bytes:
+    db = SessionLocal()
+    try:
+        user = db.get(models.User, ctx.user.id)
+        data = case.run(db, ctx._replace(user=user))
+        if isinstance(data, Response):
+            # Endpoints on the serialization fast path return their body ready-made
+            return data.body
+        return serialization.dump_json(case.response_model, data)
+    finally:
+        db.close()
+
+
+def run_suite(sizes: List[int], repeat: int, budgets_per_size: int, only: List[str],
+              reset: bool = False) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in sizes:
+        common.reset_database(reset)
+        user_id = common.seed(size)
+        common.seed_budgets(user_id, budgets_per_size)
+        ctx = Context(user=models.User(id=user_id), today=datetime.now())
+        for case in CASES:
+            if only and not any(pattern in case.name for pattern in only):
+                continue
+            body = _call(case, ctx)  # warm up connections, statement and adapter caches
+            if case.expect_rows and not json.loads(body):
+                raise SystemExit(f"{case.name}@{size} returned no rows; the seeded data does not exercise it")
+            results[f"{case.name}@{size}"] = common.summarize(
+                common.timed(lambda: _call(case, ctx), repeat=repeat)
+            )
+            print(f"{case.name + '@' + str(size):<56} median_ms={results[f'{case.name}@{size}']['median_ms']}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float, noise_ms: float) -> List[str]:
+    """Print each case against the baseline and return the names that regressed.
+
+    A case regresses when its median is more than `threshold` (a fraction)
+    slower and the difference is above the noise floor `noise_ms`.
+    """
+    regressions = []
+    print(f"\n{'case':<56} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<56} {'-':>10} {stats['median_ms']:>10} {'new':>8}")
+            continue
+        before, after = previous["median_ms"], stats["median_ms"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > noise_ms
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<56} {before:>10} {after:>10} {change:>+8.1%}" + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated transaction counts to seed, one run per size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budgets", type=int, default=50, help="Budgets seeded per size")
+    parser.add_argument("--only", action="append", default=[], help="Only run cases whose name contains this")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown of a case's median, as a fraction")
+    parser.add_argument("--noise-ms", type=float, default=2.0,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    common.add_reset_argument(parser)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_suite(sizes, args.repeat, args.budgets, args.only, args.reset)
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("database") != engine.dialect.name:
+        print(f"Baseline was recorded on {baseline['meta'].get('database')}, not {engine.dialect.name}")
+    regressions = compare(results, baseline["results"], args.threshold, args.noise_ms)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""Fill the database with deterministic synthetic wallet data for scale testing.
+
+    python generate_data.py --users 100 --transactions 10000000 --seed 42
+
+Every user gets one account of each AccountType, a two-level category
+tree, monthly budgets and a share of the transactions: a salary and rent
+every month plus day-to-day spending that is heavier at weekends, around
+the holidays and (for travel) in the summer. Rows are written with COPY on
+Postgres and executemany elsewhere, bypassing the ORM, while the
+transaction indexes and foreign keys are set aside; the same seed and end
+date always produce the same data. Rollups, budget spend and balance
+snapshots are rebuilt at the end.
+"""
+import argparse
+import bisect
+import csv
+import io
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import column, insert, table, text
+
+from app import cache, models
+from app.database import SessionLocal, engine
+from app.models import AccountType, TransactionType
+from app.services.balance_service import rebuild_snapshots
+from app.services.budget_service import refresh_spent
+from app.services.rollup_service import rebuild_rollups
+
+CHUNK_SIZE = 100000
+
+COLUMNS = ("amount", "type", "description", "date", "category_id", "account_id", "owner_id")
+# Untyped stand-in for the transactions table: values go to the driver as
+# generated (integer cents, enum names) without per-row type processing
+TRANSACTIONS = table("transactions", *(column(name) for name in COLUMNS))
+
+
+class Leaf(NamedTuple):
+    name: str
+    type: TransactionType
+    weight: float          # share of day-to-day transactions
+    median: float          # typical amount in major units
+    spread: float          # lognormal sigma
+    account_types: Tuple[AccountType, ...]
+    season: Dict[int, float]  # month -> weight multiplier
+    merchants: Tuple[str, ...]
+
+
+HOLIDAYS = {11: 1.3, 12: 2.0}
+SUMMER = {6: 1.8, 7: 2.5, 8: 2.5}
+
+# Two-level category tree. The schema has no parent column, so a leaf is
+# stored as a category named "Parent / Leaf"
+CATEGORY_TREE: Dict[str, List[Leaf]] = {
+    "Income": [
+        Leaf("Salary", TransactionType.INCOME, 0, 0, 0, (AccountType.BANK,), {}, ("Employer payroll",)),
+        Leaf("Freelance", TransactionType.INCOME, 0.6, 250, 0.6, (AccountType.BANK, AccountType.MOBILE_MONEY),
+             {}, ("Client payment", "Invoice")),
+        Leaf("Interest", TransactionType.INCOME, 0.2, 8, 0.5, (AccountType.BANK,), {}, ("Savings interest",)),
+    ],
+    "Housing": [
+        Leaf("Rent", TransactionType.EXPENSE, 0, 0, 0, (AccountType.BANK,), {}, ("Landlord",)),
+        Leaf("Utilities", TransactionType.EXPENSE, 1.0, 60, 0.4, (AccountType.BANK, AccountType.MOBILE_MONEY),
+             {1: 1.3, 2: 1.3, 12: 1.2}, ("Electricity", "Water", "Gas")),
+        Leaf("Internet", TransactionType.EXPENSE, 0.4, 35, 0.2, (AccountType.MOBILE_MONEY,), {},
+             ("ISP", "Airtime bundle")),
+    ],
+    "Food": [
+        Leaf("Groceries", TransactionType.EXPENSE, 12.0, 35, 0.7, (AccountType.BANK, AccountType.CASH),
+             HOLIDAYS, ("Supermarket", "Market", "Corner shop")),
+        Leaf("Restaurants", TransactionType.EXPENSE, 6.0, 22, 0.6, (AccountType.BANK, AccountType.MOBILE_MONEY),
+             {12: 1.6}, ("Restaurant", "Takeaway", "Food delivery")),
+        Leaf("Coffee", TransactionType.EXPENSE, 8.0, 4, 0.3, (AccountType.CASH, AccountType.MOBILE_MONEY), {},
+             ("Cafe", "Coffee shop")),
+    ],
+    "Transport": [
+        Leaf("Fuel", TransactionType.EXPENSE, 3.0, 45, 0.4, (AccountType.BANK,), SUMMER, ("Fuel station",)),
+        Leaf("Public transport", TransactionType.EXPENSE, 7.0, 3, 0.4, (AccountType.CASH, AccountType.MOBILE_MONEY),
+             {}, ("Bus", "Train", "Moto taxi")),
+        Leaf("Taxi", TransactionType.EXPENSE, 2.0, 15, 0.5, (AccountType.MOBILE_MONEY,), {12: 1.5}, ("Ride hailing",)),
+    ],
+    "Leisure": [
+        Leaf("Travel", TransactionType.EXPENSE, 0.5, 300, 0.9, (AccountType.BANK,), SUMMER, ("Airline", "Hotel")),
+        Leaf("Entertainment", TransactionType.EXPENSE, 2.0, 25, 0.6, (AccountType.BANK, AccountType.MOBILE_MONEY),
+             {}, ("Cinema", "Concert", "Sports")),
+        Leaf("Subscriptions", TransactionType.EXPENSE, 0.8, 12, 0.3, (AccountType.BANK,), {},
+             ("Streaming", "Music", "Cloud storage")),
+    ],
+    "Shopping": [
+        Leaf("Clothing", TransactionType.EXPENSE, 1.5, 55, 0.7, (AccountType.BANK,), {11: 2.0, 12: 1.8, 1: 1.4},
+             ("Clothing store", "Online shop")),
+        Leaf("Electronics", TransactionType.EXPENSE, 0.3, 180, 0.9, (AccountType.BANK,), {11: 2.5, 12: 2.0},
+             ("Electronics store", "Online shop")),
+        Leaf("Gifts", TransactionType.EXPENSE, 0.7, 40, 0.7, (AccountType.BANK, AccountType.CASH), {12: 5.0},
+             ("Gift shop", "Florist")),
+    ],
+    "Health": [
+        Leaf("Pharmacy", TransactionType.EXPENSE, 1.0, 18, 0.6, (AccountType.CASH, AccountType.BANK), {1: 1.4, 2: 1.3},
+             ("Pharmacy",)),
+        Leaf("Doctor", TransactionType.EXPENSE, 0.2, 80, 0.5, (AccountType.BANK,), {}, ("Clinic",)),
+    ],
+}
+
+LEAVES = [(parent, leaf) for parent, leaves in CATEGORY_TREE.items() for leaf in leaves]
+DAILY = [index for index, (_, leaf) in enumerate(LEAVES) if leaf.weight > 0]
+SALARY = next(index for index, (_, leaf) in enumerate(LEAVES) if leaf.name == "Salary")
+RENT = next(index for index, (_, leaf) in enumerate(LEAVES) if leaf.name == "Rent")
+BUDGETED = ("Groceries", "Restaurants", "Fuel", "Entertainment", "Clothing")
+WEEKEND = 1.4
+
+
+def _cumulative(weights: List[float]) -> List[float]:
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _category_weights() -> Dict[int, List[float]]:
+    # Per calendar month, cumulative weights over the day-to-day leaves
+    return {
+        month: _cumulative([LEAVES[index][1].weight * LEAVES[index][1].season.get(month, 1.0) for index in DAILY])
+        for month in range(1, 13)
+    }
+
+
+def _day_weight(day: datetime) -> float:
+    weight = WEEKEND if day.weekday() >= 5 else 1.0
+    if day.month == 12 and day.day >= 10:
+        weight *= 1.5
+    return weight
+
+
+def _mean_amount(leaf: Leaf) -> float:
+    # Mean of the lognormal around the leaf's median
+    return leaf.median * math.exp(leaf.spread ** 2 / 2)
+
+
+def _expected_spend(daily_per_month: float) -> Dict[str, float]:
+    """Average monthly spend per expense leaf for a user with this many day-to-day transactions a month"""
+    total_weight = sum(LEAVES[index][1].weight for index in DAILY)
+    return {
+        leaf.name: daily_per_month * leaf.weight / total_weight * _mean_amount(leaf)
+        for leaf in (LEAVES[index][1] for index in DAILY) if leaf.type == TransactionType.EXPENSE
+    }
+
+
+def _create_user(conn, rng: random.Random, seed: int, number: int, start: datetime, days: int,
+                 spend: Dict[str, float]):
+    """Insert one user with accounts, categories and budgets; return the ids the transactions need"""
+    user_id = conn.execute(
+        insert(models.User).values(email=f"synthetic-{seed}-{number}@example.com", full_name=f"Synthetic User {number}")
+        .returning(models.User.id)
+    ).scalar_one()
+    accounts = {}
+    for account_type in AccountType:
+        accounts[account_type] = conn.execute(
+            insert(models.Account).values(
+                name=f"{account_type.value.replace('_', ' ').title()} account",
+                type=account_type,
+                balance=round(rng.uniform(0, 5000), 2),
+                currency="USD",
+                owner_id=user_id,
+            ).returning(models.Account.id)
+        ).scalar_one()
+    categories = []
+    for parent, leaf in LEAVES:
+        categories.append(conn.execute(
+            insert(models.Category).values(
+                name=f"{parent} / {leaf.name}", type=leaf.type, description=parent, owner_id=user_id
+            ).returning(models.Category.id)
+        ).scalar_one())
+
+    budgets = []
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=days)
+    while month < end:
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        for index, (_, leaf) in enumerate(LEAVES):
+            if leaf.name in BUDGETED:
+                # Some budgets are tight enough to cross their threshold
+                budgets.append({
+                    "amount": max(10, round(spend[leaf.name] * rng.uniform(1.0, 1.6), -1)),
+                    "spent": 0,
+                    "start_date": month,
+                    "end_date": next_month - timedelta(seconds=1),
+                    "category_id": categories[index],
+                    "owner_id": user_id,
+                    "notification_threshold": 0.8,
+                    "is_active": True,
+                })
+        month = next_month
+    conn.execute(insert(models.Budget), budgets)
+    return user_id, accounts, categories
+
+
+def _transactions(rng: random.Random, user, daily: int, months: List[datetime], day_list: List[datetime],
+                  spend: Dict[str, float], category_weights: Dict[int, List[float]]) -> Iterator[tuple]:
+    """Yield (cents, type name, description, date, category_id, account_id, owner_id) rows.
+
+    Dates are already formatted the way SQLAlchemy stores DateTime on SQLite,
+    which Postgres parses as well; formatting a datetime per row would cost
+    more than generating it.
+    """
+    user_id, accounts, categories = user
+    day_weights = _cumulative([_day_weight(day) for day in day_list])
+    days = [(f"{day:%Y-%m-%d} ", category_weights[day.month]) for day in day_list]
+    leaves = [
+        (leaf.type.name, math.log(leaf.median), leaf.spread, leaf.merchants,
+         [accounts[account_type] for account_type in leaf.account_types], categories[index])
+        for index, (_, leaf) in ((index, LEAVES[index]) for index in DAILY)
+    ]
+
+    # Fixed monthly income and rent, sized so that the user roughly breaks even
+    monthly_spend = sum(spend.values())
+    salary = round(monthly_spend * rng.uniform(1.4, 1.8) * 100)
+    rent = round(monthly_spend * rng.uniform(0.3, 0.5) * 100)
+    for month in months:
+        yield (salary, "INCOME", "Employer payroll", f"{month:%Y-%m}-25 09:00:00.000000",
+               categories[SALARY], accounts[AccountType.BANK], user_id)
+        yield (rent, "EXPENSE", "Landlord", f"{month:%Y-%m}-01 08:00:00.000000",
+               categories[RENT], accounts[AccountType.BANK], user_id)
+
+    times = _times()
+    total_weight = day_weights[-1]
+    random_ = rng.random
+    for _ in range(daily):
+        day, weights = days[bisect.bisect(day_weights, random_() * total_weight)]
+        type_, mu, sigma, merchants, account_ids, category_id = leaves[bisect.bisect(weights, random_() * weights[-1])]
+        yield (
+            max(1, round(rng.lognormvariate(mu, sigma) * 100)),
+            type_,
+            merchants[int(random_() * len(merchants))],
+            day + times[int(random_() * 86400)],
+            category_id,
+            account_ids[int(random_() * len(account_ids))],
+            user_id,
+        )
+
+
+def _times() -> List[str]:
+    return [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}.000000" for second in range(86400)]
+
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy(conn, rows: List[tuple]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY transactions ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _executemany(conn, rows: List[tuple]) -> None:
+    if conn.dialect.paramstyle == "qmark":
+        # Positional rows straight to the driver (sqlite3)
+        conn.exec_driver_sql(
+            f"INSERT INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+        )
+    else:
+        conn.execute(insert(TRANSACTIONS), [dict(zip(COLUMNS, row)) for row in rows])
+
+
+@contextmanager
+def _bulk_load(keep_constraints: bool):
+    """Drop the transaction indexes (and foreign keys on Postgres) for the load, restore them after.
+
+    Building an index or validating a foreign key once over the loaded table
+    is far cheaper than maintaining it row by row; the generated ids are
+    valid by construction. Everything is restored even if the load fails.
+    """
+    indexes, foreign_keys = [], []
+    if not keep_constraints:
+        indexes = [
+            index for index in models.Transaction.__table__.indexes
+            if any(not column.primary_key for column in index.columns)
+        ]
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                foreign_keys = conn.execute(text(
+                    "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                    "WHERE conrelid = 'transactions'::regclass AND contype = 'f'"
+                )).all()
+            for name, _ in foreign_keys:
+                conn.execute(text(f'ALTER TABLE transactions DROP CONSTRAINT "{name}"'))
+            for index in indexes:
+                index.drop(conn, checkfirst=True)
+    try:
+        yield
+    finally:
+        if indexes or foreign_keys:
+            started = time.perf_counter()
+            with engine.begin() as conn:
+                for index in indexes:
+                    index.create(conn, checkfirst=True)
+                for name, definition in foreign_keys:
+                    conn.execute(text(f'ALTER TABLE transactions ADD CONSTRAINT "{name}" {definition}'))
+            print(f"Restored {len(indexes)} indexes and {len(foreign_keys)} foreign keys "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic wallet data for scale testing")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=1000000, help="Total across all users")
+    parser.add_argument("--days", type=int, default=730, help="History length")
+    parser.add_argument("--end-date", type=lambda value: datetime.strptime(value, "%Y-%m-%d"), default=None,
+                        help="Last day of history (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-constraints", action="store_true",
+                        help="Keep the transaction indexes and foreign keys in place during the load")
+    parser.add_argument("--skip-derived", action="store_true",
+                        help="Do not rebuild rollups, budget spend and balance snapshots")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # The same seed and end date always give the same rows
+    end = args.end_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days - 1)
+    day_list = [start + timedelta(days=offset) for offset in range(args.days)]
+    months = [day for day in day_list if day.day == 1]
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+    write = _copy if use_copy else _executemany
+    category_weights = _category_weights()
+
+    began = time.perf_counter()
+    written = 0
+    user_ids = []
+    per_user, extra = divmod(args.transactions, args.users)
+    with _bulk_load(args.keep_constraints):
+        for number in range(args.users):
+            count = per_user + (number < extra)
+            # Salary and rent each month come out of the user's share
+            recurring = min(2 * len(months), count - count % 2)
+            daily = count - recurring
+            spend = _expected_spend(daily / max(len(months), 1))
+            # One DB transaction per user keeps each commit a bounded size
+            with engine.begin() as conn:
+                user = _create_user(conn, rng, args.seed, number, start, args.days, spend)
+                user_ids.append(user[0])
+                rows = _transactions(rng, user, daily, months[:recurring // 2], day_list, spend, category_weights)
+                for chunk in _chunks(rows, CHUNK_SIZE):
+                    write(conn, chunk)
+                    written += len(chunk)
+            elapsed = time.perf_counter() - began
+            print(f"user {number + 1}/{args.users}: {written} transactions, {written / elapsed:,.0f} rows/s")
+
+    if not args.skip_derived:
+        db = SessionLocal()
+        try:
+            print(f"Rebuilt {rebuild_rollups(db)} monthly rollup rows")
+            refresh_spent(db)
+            db.commit()
+            print(f"Rebuilt {rebuild_snapshots(db)} balance snapshot rows")
+        finally:
+            db.close()
+    for user_id in user_ids:
+        cache.bump_version(user_id)
+    print(f"Done in {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
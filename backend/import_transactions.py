@@ -0,0 +1,37 @@
+import argparse
+
+from app import cache
+from app.database import SessionLocal
+from app.dependencies import get_current_user
+from app.services import import_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV or OFX bank/mobile-money statement")
+    parser.add_argument("path", help="Statement file")
+    parser.add_argument("--format", choices=sorted(import_service.PARSERS), default=None,
+                        help="Statement format, defaults to the file extension")
+    parser.add_argument("--account-id", type=int, default=None, help="Account for rows that do not name one")
+    parser.add_argument("--category-id", type=int, default=None, help="Category for rows that do not name one")
+    args = parser.parse_args()
+
+    file_format = args.format or import_service.detect_format(args.path)
+    if file_format is None:
+        parser.error("cannot tell the statement format, pass --format")
+
+    db = SessionLocal()
+    try:
+        user = get_current_user(db)
+        with open(args.path, "rb") as stream:
+            result = import_service.import_transactions(
+                db, stream, file_format, user.id,
+                account_id=args.account_id, category_id=args.category_id
+            )
+        cache.bump_version(user.id)
+        print(f"Imported {result['imported']} transactions, {result['failed']} rows failed")
+        for error in result["errors"]:
+            print(f"  line {error['line']}: {error['error']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
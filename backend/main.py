@@ -1,22 +1,22 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-import uvicorn
 
-from app.database import engine, get_db
-from app.models import Base
-from app.routers import users, auth, transactions, categories, accounts, budgets, reports, dashboard
+from app.database import get_db
+from app.routers import users, auth, transactions, categories, accounts, budgets, reports, dashboard, system
 from app.config import settings
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app import metrics, query_stats
+from app.lifespan import lifespan
 
 app = FastAPI(
     title="Wallet Web Application API",
     description="API for managing personal finances across multiple accounts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 origins = [
@@ -36,6 +36,10 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+app.add_middleware(query_stats.QueryStatsMiddleware)
+# Outermost, so the latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -45,10 +49,14 @@ app.include_router(accounts.router, prefix="/api/accounts", tags=["Accounts"])
 app.include_router(budgets.router, prefix="/api/budgets", tags=["Budgets"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(system.router, prefix="/api/system", tags=["System"])
+app.include_router(metrics.router, tags=["System"])
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Wallet Web Application API"}
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,35 @@
+import argparse
+
+from app import cache
+from app.database import SessionLocal
+from app.models import Account, Budget, User
+from app.services.balance_service import rebuild_snapshots
+from app.services.budget_service import refresh_spent
+from app.services.rollup_service import rebuild_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute monthly rollups, budget spend and balance snapshots from the transactions table")
+    parser.add_argument("--owner-id", type=int, default=None, help="Only rebuild data for this user")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollups(db, owner_id=args.owner_id)
+        print(f"Rebuilt {rows} monthly rollup rows")
+        filters = [Budget.owner_id == args.owner_id] if args.owner_id is not None else []
+        refresh_spent(db, *filters)
+        db.commit()
+        print("Recomputed budget spend")
+        account_ids = None
+        if args.owner_id is not None:
+            account_ids = [id_ for (id_,) in db.query(Account.id).filter(Account.owner_id == args.owner_id)]
+        rows = rebuild_snapshots(db, account_ids=account_ids)
+        print(f"Rebuilt {rows} balance snapshot rows")
+        owner_ids = [args.owner_id] if args.owner_id is not None else [id_ for (id_,) in db.query(User.id)]
+        for owner_id in owner_ids:
+            cache.bump_version(owner_id)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
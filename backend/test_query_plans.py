@@ -0,0 +1,173 @@
+"""Query plan regression check for the hot dashboard and report queries.
+
+Runs each hot query path against the configured database inside a
+transaction that is rolled back, captures the SELECT statements it issues
+and EXPLAINs them with the default planner settings. The table is seeded
+with several owners' history and analyzed first, so the planner sees
+selective owner filters as it does in production. A read of the
+transactions table fails the check unless an index condition bounds it: a
+sequential scan, or a full scan of some index, means the access path
+index for the query is missing. When no database is reachable the pytest
+check is skipped.
+
+    python test_query_plans.py
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app import models
+from app.services import dashboard_service, report_service
+
+CHECKED_TABLES = ("transactions",)
+SEED_OWNERS = 20
+SEED_TRANSACTIONS_PER_OWNER = 500
+
+
+def seed(db: Session) -> int:
+    """Give SEED_OWNERS users a year of transactions each; return the first one's id"""
+    now = datetime.now()
+    user_ids = []
+    for number in range(SEED_OWNERS):
+        user = models.User(email=f"plan-check-{number}@example.com", full_name="Plan Check")
+        db.add(user)
+        db.flush()
+        account = models.Account(name="Plan Check", type=models.AccountType.BANK, balance=0.0, owner_id=user.id)
+        category = models.Category(name="Plan Check", type=models.TransactionType.EXPENSE, owner_id=user.id)
+        db.add_all([account, category])
+        db.flush()
+        db.execute(insert(models.Transaction), [
+            {
+                "amount": 10.0 + i,
+                "type": models.TransactionType.EXPENSE if i % 3 else models.TransactionType.INCOME,
+                "date": now - timedelta(hours=17 * i),
+                "category_id": category.id,
+                "account_id": account.id,
+                "owner_id": user.id,
+            }
+            for i in range(SEED_TRANSACTIONS_PER_OWNER)
+        ])
+        user_ids.append(user.id)
+    db.flush()
+    # Statistics inside the transaction are rolled back with the rows
+    for table in CHECKED_TABLES:
+        db.execute(text(f"ANALYZE {table}"))
+    return user_ids[0]
+
+
+def hot_queries(db: Session, user_id: int):
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=90)
+    return {
+        "dashboard_service.get_dashboard": lambda: dashboard_service.get_dashboard(db, user_id),
+        "report_service.get_monthly_trends": lambda: report_service.get_monthly_trends(db, user_id),
+        "report_service.get_trends[day]": lambda: report_service.get_trends(db, user_id, start_date, end_date, "day"),
+        "report_service.get_category_breakdown": lambda: report_service.get_category_breakdown(db, user_id, start_date, end_date),
+        "report_service.get_financial_summary": lambda: report_service.get_financial_summary(db, user_id, start_date, end_date),
+        "report_service.generate_detailed_report": lambda: report_service.generate_detailed_report(db, user_id, start_date, end_date),
+    }
+
+
+def explain(connection, statement, parameters):
+    """The plan as a Postgres JSON plan tree, or SQLite's EXPLAIN QUERY PLAN lines"""
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def _unbounded_nodes(node):
+    """Postgres plan nodes reading a checked table without an index condition"""
+    if node.get("Relation Name") in CHECKED_TABLES:
+        kind = node["Node Type"]
+        if kind == "Seq Scan" or (kind in ("Index Scan", "Index Only Scan") and "Index Cond" not in node):
+            index = f" using {node['Index Name']}" if "Index Name" in node else ""
+            yield f"{kind} on {node['Relation Name']}{index}, no index condition"
+    for child in node.get("Plans", ()):
+        yield from _unbounded_nodes(child)
+
+
+def full_scans(plan, dialect_name):
+    if dialect_name == "postgresql":
+        return list(_unbounded_nodes(plan))
+    # SQLite says SEARCH when an index bounds the read and SCAN when it
+    # reads the whole table or a whole index
+    return [
+        line.strip() for line in plan
+        for table in CHECKED_TABLES
+        if line.strip() == f"SCAN {table}" or line.strip().startswith(f"SCAN {table} ")
+    ]
+
+
+def check_query_plans():
+    """Return a list of (query name, statement, offending plan lines)"""
+    failures = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            user_id = seed(db)
+
+            for name, run in hot_queries(db, user_id).items():
+                captured = []
+
+                def capture(conn, cursor, statement, parameters, context, executemany):
+                    if statement.lstrip().upper().startswith("SELECT"):
+                        captured.append((statement, parameters))
+
+                event.listen(connection, "before_cursor_execute", capture)
+                try:
+                    run()
+                except Exception as e:
+                    failures.append((name, None, [f"query failed: {e}"]))
+                    continue
+                finally:
+                    event.remove(connection, "before_cursor_execute", capture)
+
+                for statement, parameters in captured:
+                    scans = full_scans(explain(connection, statement, parameters), connection.dialect.name)
+                    if scans:
+                        failures.append((name, statement, scans))
+        finally:
+            transaction.rollback()
+    return failures
+
+
+def database_reachable() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except OperationalError:
+        return False
+
+
+def test_query_plans():
+    import pytest
+
+    if not database_reachable():
+        pytest.skip(f"no database reachable at {engine.url!r}")
+    failures = check_query_plans()
+    assert not failures, "\n\n".join(
+        f"{name}:\n{statement}\n  -> " + "\n  -> ".join(scans)
+        for name, statement, scans in failures
+    )
+
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    for name, statement, scans in failures:
+        print(f"\n=== {name} ===")
+        if statement:
+            print(statement)
+        for scan in scans:
+            print(f"  -> {scan}")
+    if failures:
+        print(f"\n{len(failures)} query plan regression(s) found")
+        sys.exit(1)
+    print("All hot queries use indexes")
@@ -0,0 +1,112 @@
+"""Startup time budget check for the API.
+
+Imports the app in fresh interpreters (so nothing is cached from a
+previous import) and fails when the median import time, or the time the
+lifespan takes before the first request is accepted, is over budget.
+Importing must not open a database connection: schema work belongs to
+the lifespan.
+
+    python test_startup_time.py
+    python test_startup_time.py --module app.main --import-budget-ms 2000
+    python -m pytest test_startup_time.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_PROBE = """
+import importlib, json, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps({{"import_ms": (time.perf_counter() - start) * 1000}}))
+"""
+
+# Listens for pool connects from before the import, then runs the lifespan
+# the way the server does before accepting requests
+STARTUP_PROBE = """
+import asyncio, importlib, json, time
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connects = []
+event.listen(Pool, "connect", lambda *args: connects.append(1))
+module = importlib.import_module({module!r})
+connects_on_import = len(connects)
+
+async def startup():
+    start = time.perf_counter()
+    async with module.app.router.lifespan_context(module.app):
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+elapsed = asyncio.run(startup())
+print(json.dumps({{"connects_on_import": connects_on_import, "startup_ms": elapsed * 1000}}))
+"""
+
+
+IMPORT_BUDGET_MS = 2500.0
+STARTUP_BUDGET_MS = 1000.0
+
+
+def _probe(source: str) -> dict:
+    # Run from this directory so the app module imports however pytest was started
+    output = subprocess.run(
+        [sys.executable, "-c", source], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_startup(module: str = "main", repeat: int = 5) -> dict:
+    """Median import time, lifespan startup time and connections opened by the import"""
+    import_ms = statistics.median(
+        _probe(IMPORT_PROBE.format(module=module))["import_ms"] for _ in range(repeat)
+    )
+    return {"import_ms": import_ms, **_probe(STARTUP_PROBE.format(module=module))}
+
+
+def check_startup(measurements: dict, import_budget_ms: float = IMPORT_BUDGET_MS,
+                  startup_budget_ms: float = STARTUP_BUDGET_MS) -> list:
+    """Return the budgets the measurements break"""
+    failures = []
+    if measurements["import_ms"] > import_budget_ms:
+        failures.append(f"import time over budget: {measurements['import_ms']:.0f} ms > {import_budget_ms:.0f} ms")
+    if measurements["startup_ms"] > startup_budget_ms:
+        failures.append(
+            f"lifespan startup over budget: {measurements['startup_ms']:.0f} ms > {startup_budget_ms:.0f} ms"
+        )
+    if measurements["connects_on_import"]:
+        failures.append(f"importing the app opened {measurements['connects_on_import']} database connection(s)")
+    return failures
+
+
+def test_startup_budget():
+    failures = check_startup(measure_startup())
+    assert not failures, "; ".join(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="Module that defines the FastAPI app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    measurements = measure_startup(args.module, args.repeat)
+    print(f"import {args.module}: {measurements['import_ms']:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"lifespan startup: {measurements['startup_ms']:.0f} ms (budget {args.startup_budget_ms:.0f} ms)")
+    print(f"connections opened by the import: {measurements['connects_on_import']}")
+
+    failures = check_startup(measurements, args.import_budget_ms, args.startup_budget_ms)
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()